@@ -0,0 +1,121 @@
+import atexit
+import threading
+import time
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+
+class ActivityTracker:
+    """Coalesces user activity in memory and writes it as one bulk_write per heartbeat.
+
+    Each rerun only bumps an in-memory counter. Every `heartbeat_seconds` the
+    pending activity of all sessions is flushed as upserts, so a user's
+    document is written at most once per heartbeat however often they rerun.
+    """
+
+    def __init__(self, collection, heartbeat_seconds=30, on_new_users=None):
+        self.collection = collection
+        self.on_new_users = on_new_users  # called with the first-seen times of newly created users
+        self.heartbeat_seconds = heartbeat_seconds
+        self._pending = {}  # user_id -> {"first_seen", "last_active", "count"}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.touches = 0
+        self.flushes = 0
+        self.users_written = 0
+        self.last_flush_ms = 0.0
+        self._thread = threading.Thread(target=self._run, name="activity-tracker", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def touch(self, user_id, now=None):
+        """Record one access by a user"""
+        now = now or datetime.now()
+        with self._lock:
+            self.touches += 1
+            entry = self._pending.get(user_id)
+            if entry is None:
+                self._pending[user_id] = {"first_seen": now, "last_active": now, "count": 1}
+            else:
+                entry["last_active"] = max(entry["last_active"], now)
+                entry["count"] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.heartbeat_seconds):
+            self.flush()
+
+    def flush(self):
+        """Write all pending activity in one unordered bulk_write"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        operations = [
+            UpdateOne(
+                {'user_id': user_id},
+                {
+                    '$setOnInsert': {'created_at': entry['first_seen']},
+                    '$max': {'last_active': entry['last_active']},
+                    '$inc': {'access_count': entry['count']}
+                },
+                upsert=True
+            )
+            for user_id, entry in pending.items()
+        ]
+        users = list(pending)
+        started = time.perf_counter()
+        try:
+            upserted = self.collection.bulk_write(operations, ordered=False).upserted_ids
+            failed = set()
+        except BulkWriteError as e:
+            # Unordered: every other update was applied, so only the failed ones are
+            # retried; requeueing the whole batch would $inc the rest a second time
+            upserted = {item['index']: item['_id'] for item in e.details.get('upserted', [])}
+            failed = {error['index'] for error in e.details.get('writeErrors', [])}
+            print(f"Error flushing activity for {len(failed)} of {len(users)} users: {str(e)}")
+            self._requeue({users[i]: pending[users[i]] for i in failed})
+        except Exception as e:
+            print(f"Error flushing user activity: {str(e)}")
+            self._requeue(pending)
+            return 0
+        written = len(users) - len(failed)
+        with self._lock:
+            self.flushes += 1
+            self.users_written += written
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+        if self.on_new_users and upserted:
+            try:
+                self.on_new_users([pending[users[i]]['first_seen'] for i in upserted])
+            except Exception as e:
+                print(f"Error in new-user hook: {str(e)}")
+        return written
+
+    def _requeue(self, pending):
+        # Merge a failed batch back so it is retried on the next heartbeat
+        with self._lock:
+            for user_id, entry in pending.items():
+                current = self._pending.get(user_id)
+                if current is None:
+                    self._pending[user_id] = entry
+                else:
+                    current["first_seen"] = min(current["first_seen"], entry["first_seen"])
+                    current["last_active"] = max(current["last_active"], entry["last_active"])
+                    current["count"] += entry["count"]
+
+    def close(self):
+        if not self._stop.is_set():
+            self._stop.set()
+            self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending_users": len(self._pending),
+                "touches": self.touches,
+                "flushes": self.flushes,
+                "users_written": self.users_written,
+                "writes_saved": max(0, self.touches - sum(e["count"] for e in self._pending.values()) - self.users_written),
+                "last_flush_ms": self.last_flush_ms,
+                "heartbeat_seconds": self.heartbeat_seconds,
+            }
@@ -1,9 +1,19 @@
 import streamlit as st
 import google.generativeai as genai
-import json
+import time
+import hashlib
 from datetime import datetime
 import pytz
-from database import init_database, get_course_data, save_chat, get_or_create_user_session
+from database import init_database, get_course_data, get_course_data_version, save_chat, get_or_create_user_session
+from prompts import compile_system_prompt, build_turn, prompt_sizes
+from retrieval import retrieve
+from cache import answer_cache, normalize_question
+from fastpath import fast_path
+from memory import ConversationMemory, TruncateStrategy, SummarizeStrategy, SUMMARY_INSTRUCTION
+from perf import span, timed, timings
+from config import get_setting
+
+rerun_started = time.perf_counter()
 
 # Must be the first Streamlit command
 st.set_page_config(
@@ -21,64 +31,121 @@ user_id = get_or_create_user_session()
 GOOGLE_API_KEY = st.secrets["GOOGLE_API_KEY"]
 genai.configure(api_key=GOOGLE_API_KEY)
 
-# Initialize Gemini model
-model = genai.GenerativeModel('gemini-2.0-flash')
-
-# Get course data from database
-data = {"courses": get_course_data()}
-
-# Create a context for the AI
-bot_name = "SRM AcadBuddy"
-context = f"""
-You are {bot_name}, a helpful and friendly college bot assistant. You support both new and current students by providing information and handling various student-related services.
-
+# Get course data from database and compile the system instruction once per catalog version
+catalog_version = get_course_data_version()
+courses = get_course_data()
+compiled_prompt = compile_system_prompt(catalog_version, courses)
 
-{json.dumps(data, indent=2)}
+@st.cache_resource
+def get_model(system_instruction):
+    """Gemini model shared across sessions for a given system instruction"""
+    return genai.GenerativeModel('gemini-2.0-flash', system_instruction=system_instruction)
 
-You have access to the following data:
-- Course details
-- Student academic information (marks, attendance percentage)
-- Timetable
-- Admission process
-- Complaint submission system (hostel, department, subject, canteen, transport, general)
-
-Key points to remember:
-1. Always be polite, clear, and professional
-2. Provide accurate information based on the data provided
-3. For course-related queries, use the course data
-4. For marks and attendance, respond only if user is authenticated (e.g., roll number is given)
-5. Guide students through complaint submission steps
-6. Handle general queries and greetings naturally
-7. If asked for something not available, politely explain the limitation
-8. Keep responses concise, helpful, and friendly
-9. Use appropriate emojis to keep the chat engaging
-10. Format responses using markdown for better readability
-
-Example interactions:
-- Greet users warmly
-- Help new students with admission process
-- Answer questions about course duration, fees, and subjects
-- Show academic performance (marks, attendance %) after verifying roll number
-- Guide users to file complaints with category selection
-- Display class timetable in a table format
-- Handle small talk naturally
-- Stay focused on student and academic-related queries
-"""
+model = get_model(compiled_prompt.text)
 
 # Initialize chat history in session state
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []  # This will store (user_msg, bot_msg, timestamp) tuples
 if 'current_question' not in st.session_state:
     st.session_state.current_question = ""
-if 'chat' not in st.session_state:
-    st.session_state.chat = model.start_chat(history=[])
+if 'memory' not in st.session_state:
+    # Bounded conversation memory; older turns are dropped or summarised per MEMORY_STRATEGY
+    if get_setting("MEMORY_STRATEGY", "truncate") == "summarize":
+        strategy = SummarizeStrategy(get_model(SUMMARY_INSTRUCTION))
+    else:
+        strategy = TruncateStrategy()
+    st.session_state.memory = ConversationMemory(
+        strategy,
+        max_turns=int(get_setting("MEMORY_MAX_TURNS", 6)),
+        max_tokens=int(get_setting("MEMORY_MAX_TOKENS", 2000))
+    )
+
+def user_bubble(text):
+    return f"""
+                <div class="chat-message user-message">
+                    <strong>You:</strong> {text}
+                </div>
+            """
 
-def get_ai_response(user_input):
+def bot_bubble(text):
+    return f"""
+                <div class="chat-message bot-message">
+                    <strong>Assistant:</strong>
+                    {text}</div>
+            """
+
+# Stream answers token-by-token unless disabled in secrets or the environment
+STREAM_RESPONSES = str(get_setting("STREAM_RESPONSES", "true")).lower() in ("1", "true", "yes")
+
+@timed()
+def get_ai_response(user_input, placeholder=None):
     try:
-        prompt = f"Context: {context}\n\nUser: {user_input}\n\nResponse:"
-        response = st.session_state.chat.send_message(prompt)
-        save_chat(user_input, response.text)
-        return response.text
+        memory = st.session_state.memory
+
+        # Plain catalog lookups (fees, duration, semesters, subjects) need no LLM call
+        direct = fast_path.answer(catalog_version, courses, user_input)
+        if direct is not None:
+            if placeholder is not None:
+                placeholder.markdown(bot_bubble(direct), unsafe_allow_html=True)
+            memory.add(user_input, direct)
+            save_chat(user_input, direct, fast_path=True)
+            return direct
+
+        # Answers depend on the conversation so far, so follow-ups only share a cached
+        # answer with conversations that have the same memory
+        context = memory.text()
+        context_digest = hashlib.sha256(context.encode('utf-8')).hexdigest() if context else None
+        cache_key = (normalize_question(user_input), catalog_version, context_digest)
+        cached = answer_cache.get(cache_key, None)
+        if cached is not None:
+            if placeholder is not None:
+                placeholder.markdown(bot_bubble(cached), unsafe_allow_html=True)
+            memory.add(user_input, cached)
+            save_chat(user_input, cached, from_cache=True)
+            return cached
+
+        # Only the catalog chunks relevant to this question travel with the turn
+        with span("retrieve"):
+            chunks = retrieve(catalog_version, courses, user_input)
+        st.session_state.prompt_sizes = prompt_sizes(
+            compiled_prompt, user_input, memory.text(),
+            "\n".join(chunk.text for chunk in chunks)
+        )
+        message = build_turn(user_input, chunks)
+        # A fresh session over the bounded history; retrieved course data is not kept in it
+        chat = model.start_chat(history=memory.history())
+        started = time.perf_counter()
+        first_token = None
+
+        with span("gemini.send_message"):
+            if STREAM_RESPONSES and placeholder is not None:
+                text = ""
+                for part in chat.send_message(message, stream=True):
+                    try:
+                        piece = part.text
+                    except ValueError:
+                        # Chunks without text parts (e.g. safety metadata) carry nothing to render
+                        continue
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    text += piece
+                    placeholder.markdown(bot_bubble(text + "▌"), unsafe_allow_html=True)
+                placeholder.markdown(bot_bubble(text), unsafe_allow_html=True)
+            else:
+                text = chat.send_message(message).text
+
+        finished = time.perf_counter()
+        timings.record("gemini.first_token", (first_token or finished) - started)
+        turn_timings = {
+            "ttft_ms": round(((first_token or finished) - started) * 1000, 1),
+            "total_ms": round((finished - started) * 1000, 1),
+            "streamed": bool(STREAM_RESPONSES and placeholder is not None)
+        }
+        if text:
+            answer_cache.set(cache_key, text)
+        memory.add(user_input, text)
+        save_chat(user_input, text, timings=turn_timings)
+        return text
     except Exception as e:
         st.error("An error occurred while getting a response from the AI. Please try again.")
         return f"I apologize, but I encountered an error: {str(e)}"
@@ -244,18 +311,10 @@ for message_data in st.session_state.chat_history:
             timestamp = datetime.now(pytz.timezone('Asia/Kolkata')).strftime('%H:%M')
             
         with col1:
-            st.markdown(f"""
-                <div class="chat-message user-message">
-                    <strong>You:</strong> {user}
-                </div>
-            """, unsafe_allow_html=True)
+            st.markdown(user_bubble(user), unsafe_allow_html=True)
             st.caption(timestamp)
         with col2:
-            st.markdown(f"""
-                <div class="chat-message bot-message">
-                    <strong>Assistant:</strong>
-                    {bot}</div>
-            """, unsafe_allow_html=True)
+            st.markdown(bot_bubble(bot), unsafe_allow_html=True)
             st.caption(timestamp)
 
 # Input container
@@ -271,8 +330,17 @@ with input_col2:
     send_button = st.button("Send 📤", use_container_width=True)
 
 if send_button and user_input:
+    # Show the question right away and stream the answer into its bubble
+    with chat_container:
+        col1, col2 = st.columns([6,4])
+        with col1:
+            st.markdown(user_bubble(user_input), unsafe_allow_html=True)
+        with col2:
+            placeholder = st.empty()
+            placeholder.markdown(bot_bubble("▌"), unsafe_allow_html=True)
+
     # Get AI response
-    ai_response = get_ai_response(user_input)
+    ai_response = get_ai_response(user_input, placeholder)
     
     # Get current time in IST
     current_time = datetime.now(pytz.timezone('Asia/Kolkata')).strftime('%H:%M')
@@ -282,6 +350,7 @@ if send_button and user_input:
     
     # Clear input
     st.session_state.current_question = ""
+    # Not recorded as app.rerun: this run ends early; get_ai_response has its own span
     st.rerun()
 
 # Footer
@@ -293,3 +362,6 @@ st.markdown(
     """, 
     unsafe_allow_html=True
 )
+
+# Only runs that render to the end are counted, so app.rerun means one full page render
+timings.record("app.rerun", time.perf_counter() - rerun_started)
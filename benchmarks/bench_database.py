@@ -0,0 +1,85 @@
+"""Benchmarks for the database calls and context construction behind one app.py rerun.
+
+Size-independent calls run once; calls whose cost grows with history run for
+every `--bench-sizes` value.
+"""
+from datetime import datetime, timedelta
+import pytest
+import streamlit as st
+from memory import ConversationMemory, TruncateStrategy
+from prompts import compile_system_prompt, build_turn, prompt_sizes
+from retrieval import retrieve
+
+QUESTION = "What subjects are taught in B.Sc first semester?"
+
+
+def test_init_database(benchmark, database):
+    benchmark(database.init_database)
+
+
+def test_get_or_create_user_session(benchmark, database):
+    st.session_state.pop("user_id", None)
+    benchmark(database.get_or_create_user_session)
+
+
+def test_get_course_data(benchmark, database):
+    benchmark(database.get_course_data)
+
+
+def test_context_construction(benchmark, database, fake_model):
+    """Everything get_ai_response does for an uncached question, against the fake model"""
+    version = database.get_course_data_version()
+    courses = database.get_course_data()
+    compiled = compile_system_prompt(version, courses)
+    model = fake_model(system_instruction=compiled.text)
+    memory = ConversationMemory(TruncateStrategy(), max_turns=6, max_tokens=2000)
+    for turn in range(6):
+        memory.add(f"Question {turn} about B.Tech", model.answer)
+
+    def turn():
+        chunks = retrieve(version, courses, QUESTION)
+        prompt_sizes(compiled, QUESTION, memory.text(), "\n".join(chunk.text for chunk in chunks))
+        chat = model.start_chat(history=memory.history())
+        return "".join(part.text for part in chat.send_message(build_turn(QUESTION, chunks), stream=True))
+
+    assert benchmark(turn)
+
+
+def test_save_chat(benchmark, database):
+    # Measures the request-path cost: the write itself is batched by the background writer
+    benchmark(database.save_chat, QUESTION, "B.Sc first semester covers ...", {"ttft_ms": 1.0, "total_ms": 2.0})
+
+
+def test_get_user_stats(benchmark, database, chat_rows):
+    benchmark(database.get_user_stats, refresh=True)
+
+
+def test_get_user_stats_cached(benchmark, database, chat_rows):
+    database.get_user_stats(refresh=True)
+    benchmark(database.get_user_stats)
+
+
+def test_get_course_inquiry_stats(benchmark, database, chat_rows):
+    benchmark(database.get_course_inquiry_stats, refresh=True)
+
+
+def test_get_chat_history_first_page(benchmark, database, chat_rows):
+    start, end = database.ist_range(datetime.now().date() - timedelta(days=30), datetime.now().date())
+    rows = benchmark(database.get_chat_history, start=start, end=end, limit=50)
+    assert len(rows) == min(50, chat_rows)
+
+
+def test_get_chat_history_deep_page(benchmark, database, chat_rows):
+    start, end = database.ist_range(datetime.now().date() - timedelta(days=30), datetime.now().date())
+    token = None
+    for _ in range(5):
+        rows = database.get_chat_history(start=start, end=end, limit=50, page_token=token)
+        token = database.next_page_token(rows, 50)
+    if token is None:
+        pytest.skip("fewer than six pages of history at this size")
+    benchmark(database.get_chat_history, start=start, end=end, limit=50, page_token=token)
+
+
+def test_get_chat_history_user(benchmark, database, chat_rows):
+    user_id = database.chat_collection.find_one({}, {"user_id": 1})["user_id"]
+    benchmark(database.get_chat_history, user_id=user_id, limit=50)
@@ -0,0 +1,124 @@
+"""Benchmark fixtures: a local Mongo stand-in, seeded chat history and a fake Gemini model.
+
+By default everything runs against mongomock, in process. Pass
+`--bench-mongo-uri mongodb://localhost:27017` to use a local mongod instead
+(recommended for the 100k and 1M sizes). Its `university_chatbot` database
+is emptied and re-seeded, so never point this at production.
+"""
+import os
+import random
+import sys
+from datetime import datetime
+import pytest
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seed import generate_users, generate_chats, insert_batches  # noqa: E402
+
+IST = pytz.timezone('Asia/Kolkata')
+SEED_BATCH = 10000
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("acadbuddy benchmarks")
+    group.addoption("--bench-sizes", default=os.environ.get("BENCH_SIZES", "1000"),
+                    help="comma-separated chat_history sizes to seed, e.g. 1000,100000,1000000")
+    group.addoption("--bench-mongo-uri", default=os.environ.get("BENCH_MONGO_URI"),
+                    help="benchmark against this MongoDB instead of mongomock")
+
+
+def pytest_configure(config):
+    # database.py builds its client and background workers at import time, so
+    # settings and the Mongo stand-in have to be in place before it is imported
+    uri = config.getoption("--bench-mongo-uri", default=None)
+    os.environ["MONGO_URI"] = uri or "mongodb://localhost:27017"
+    os.environ.setdefault("ADMIN_SESSION_SECRET", "benchmark-secret")
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    os.environ.setdefault("COURSE_CACHE_WATCH", "false")
+    if not uri:
+        import mongomock
+        import pymongo
+        pymongo.MongoClient = mongomock.MongoClient
+
+
+def pytest_generate_tests(metafunc):
+    if "chat_rows" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("--bench-sizes", default="1000").split(",") if size.strip()]
+        metafunc.parametrize("chat_rows", sizes, indirect=True, scope="session", ids=[f"{size:_}rows" for size in sizes])
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeChat:
+    """Stands in for a Gemini ChatSession: echoes a fixed-size answer without network I/O"""
+
+    def __init__(self, history, answer):
+        self.history = list(history or [])
+        self.answer = answer
+
+    def send_message(self, message, stream=False):
+        self.history.append({"role": "user", "parts": [message]})
+        self.history.append({"role": "model", "parts": [self.answer]})
+        if stream:
+            words = self.answer.split(" ")
+            return iter(FakeResponse(" ".join(words[i:i + 8]) + " ") for i in range(0, len(words), 8))
+        return FakeResponse(self.answer)
+
+
+class FakeGenerativeModel:
+    """Drop-in for genai.GenerativeModel used by app.py and SummarizeStrategy"""
+
+    def __init__(self, model_name="gemini-2.0-flash", system_instruction=None, answer_words=120):
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.answer = " ".join(["The course covers core subjects and electives."] * (answer_words // 7))
+
+    def start_chat(self, history=None):
+        return FakeChat(history, self.answer)
+
+    def generate_content(self, contents):
+        return FakeResponse(self.answer)
+
+
+@pytest.fixture(scope="session")
+def database():
+    import database as module
+    module.init_database()
+    yield module
+    module.chat_writer.close()
+    module.activity_tracker.close()
+
+
+@pytest.fixture(scope="session")
+def fake_model():
+    return FakeGenerativeModel
+
+
+@pytest.fixture(scope="session")
+def chat_rows(request, database):
+    """Reset the chat-side collections and seed `request.param` chat rows plus rollups"""
+    size = request.param
+    rng = random.Random(size)
+    db = database.db
+    for name in ("chat_history", "users", "daily_stats", "daily_course_stats", "activity_sketches"):
+        db[name].delete_many({})
+    database.metrics.cache.clear()
+
+    now = datetime.now(IST)
+    courses = database.get_course_data()
+    user_docs = list(generate_users(rng, max(10, size // 10), 90, now))
+    insert_batches(database.user_collection, user_docs, SEED_BATCH,
+                   on_batch=lambda batch: database.rollups.record_new_users(doc["created_at"] for doc in batch))
+    chats = generate_chats(rng, size, [doc["user_id"] for doc in user_docs], courses, 90, now)
+    insert_batches(database.chat_collection, chats, SEED_BATCH, on_batch=lambda batch: _chat_hooks(database, batch))
+    return size
+
+
+def _chat_hooks(database, batch):
+    # Same hooks the live writers call, so the rollups match the seeded history
+    database.rollups.record_chats(batch)
+    database.activity_sketches.record_chats(batch)
@@ -1,16 +1,172 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 from datetime import datetime, timedelta
 import streamlit as st
-import bcrypt
 import uuid
 import json
+import base64
+import threading
+import time
 from user_agents import parse
 import pytz
+from bson import json_util
+from config import get_setting
+from cache import answer_cache
+from write_behind import WriteBehindQueue
+from activity import ActivityTracker
+from indexes import ensure_indexes
+from export import export_chat_history as export_chat_rows
+from rollups import DailyRollups, ActivitySketches
+from metrics import MetricsService
+from sessions import AdminSessions
+from perf import timed, timings, serve_metrics
+from passwords import PasswordHasher, LoginThrottle, LoginThrottled, LoginServiceBusy, LoginTimedOut
 
-# MongoDB connection
-MONGO_URI = st.secrets["MONGO_URI"]
-client = MongoClient(MONGO_URI)
-db = client['university_chatbot']
+
+# MongoDB connection settings
+MONGO_URI = get_setting("MONGO_URI")
+# Upper bound on rows in one admin export; the whole file is sent to the browser in one response
+EXPORT_MAX_ROWS = int(get_setting("EXPORT_MAX_ROWS", 200000))
+DB_NAME = 'university_chatbot'
+ISSUES_DB_NAME = 'hostel_maintenance'
+
+POOL_SETTINGS = {
+    "maxPoolSize": int(get_setting("MONGO_MAX_POOL_SIZE", 50)),
+    "minPoolSize": int(get_setting("MONGO_MIN_POOL_SIZE", 0)),
+    "maxIdleTimeMS": int(get_setting("MONGO_MAX_IDLE_TIME_MS", 60000)),
+    "waitQueueTimeoutMS": int(get_setting("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000)),
+    "connectTimeoutMS": int(get_setting("MONGO_CONNECT_TIMEOUT_MS", 5000)),
+    "serverSelectionTimeoutMS": int(get_setting("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)),
+    "socketTimeoutMS": int(get_setting("MONGO_SOCKET_TIMEOUT_MS", 20000)),
+    "readPreference": get_setting("MONGO_READ_PREFERENCE", "primaryPreferred"),
+}
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Collects connection pool counters so the pool can be sized from real usage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.total_checkouts = 0
+        self.failed_checkouts = 0
+        self.pool_clears = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(0, self.open_connections - 1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.failed_checkouts += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+            self.total_checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "total_checkouts": self.total_checkouts,
+                "failed_checkouts": self.failed_checkouts,
+                "pool_clears": self.pool_clears,
+            }
+
+
+_pool_listener = PoolStatsListener()
+
+
+@st.cache_resource
+def get_client():
+    """Return the single pooled MongoClient shared by every page and session in this process"""
+    return MongoClient(
+        MONGO_URI,
+        event_listeners=[_pool_listener],
+        appname="srm-acadbuddy",
+        **POOL_SETTINGS
+    )
+
+
+def get_db(name=DB_NAME):
+    """Get a database from the shared client"""
+    return get_client()[name]
+
+
+def get_issues_db():
+    """Get the complaint (hostel maintenance) database from the shared client"""
+    return get_db(ISSUES_DB_NAME)
+
+
+def get_pool_stats():
+    """Get connection pool settings and usage counters for sizing the pool"""
+    stats = _pool_listener.snapshot()
+    stats["max_pool_size"] = POOL_SETTINGS["maxPoolSize"]
+    stats["min_pool_size"] = POOL_SETTINGS["minPoolSize"]
+    stats["utilisation"] = round(stats["peak_checked_out"] / POOL_SETTINGS["maxPoolSize"], 3) if POOL_SETTINGS["maxPoolSize"] else 0
+    stats["read_preference"] = POOL_SETTINGS["readPreference"]
+    return stats
+
+
+@st.cache_resource
+def bootstrap_indexes():
+    """Ensure registered indexes once per process at startup (see indexes.py)"""
+    try:
+        _, failed = ensure_indexes(get_client())
+        for name, error in failed:
+            print(f"Could not create index {name}: {error}")
+    except Exception as e:
+        print(f"Index bootstrap skipped: {str(e)}")
+
+
+@st.cache_resource
+def start_metrics_exporter():
+    """Serve /metrics for Prometheus once per process when PERF_METRICS_PORT is set"""
+    port = get_setting("PERF_METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return serve_metrics(int(port), host=get_setting("PERF_METRICS_HOST", "127.0.0.1"))
+    except OSError as e:
+        print(f"Metrics exporter not started on port {port}: {str(e)}")
+        return None
+
+
+db = get_db()
+bootstrap_indexes()
+start_metrics_exporter()
 
 # Collections
 chat_collection = db['chat_history']
@@ -18,19 +174,73 @@ course_data_collection = db['course_data']
 admin_collection = db['admins']
 user_collection = db['users']
 
+# Daily rollups are updated as chats and new users are written
+rollups = DailyRollups(db)
+activity_sketches = ActivitySketches(db)
+
+# Dashboard figures are computed once per TTL and shared across admin sessions
+metrics = MetricsService(
+    user_collection, chat_collection, rollups, activity_sketches,
+    ttl=float(get_setting("METRICS_CACHE_TTL_SECONDS", 60))
+)
+
+def record_chat_batch(chats):
+    """Chat writer hook: day counters and active-user sketches are both fed from written chats"""
+    rollups.record_chats(chats)
+    activity_sketches.record_chats(chats)
+
+# Chat logs are written off the request path in batches
+chat_writer = WriteBehindQueue(
+    chat_collection,
+    batch_size=int(get_setting("CHAT_WRITE_BATCH_SIZE", 50)),
+    flush_interval=float(get_setting("CHAT_WRITE_FLUSH_SECONDS", 1.0)),
+    max_queue=int(get_setting("CHAT_WRITE_QUEUE_SIZE", 10000)),
+    spill_path=get_setting("CHAT_WRITE_SPILL_PATH", "chat_spill.jsonl"),
+    name="chat-writer",
+    on_flush=record_chat_batch
+)
+chat_writer.replay_spill()
+
+# User activity is kept in memory and flushed in bulk at most once per heartbeat
+activity_tracker = ActivityTracker(
+    user_collection,
+    heartbeat_seconds=float(get_setting("ACTIVITY_HEARTBEAT_SECONDS", 30)),
+    on_new_users=rollups.record_new_users
+)
+
+# Signed admin sessions, validated in memory; the revocation list lives in `revoked_sessions`
+admin_sessions = AdminSessions(
+    db['revoked_sessions'],
+    admin_collection,
+    secret=get_setting("ADMIN_SESSION_SECRET"),
+    ttl_seconds=int(get_setting("ADMIN_SESSION_TTL_SECONDS", 86400)),
+    refresh_seconds=int(get_setting("ADMIN_SESSION_REFRESH_SECONDS", 300))
+)
+
+# bcrypt runs on a bounded pool at a configurable target cost; failed logins are throttled
+password_hasher = PasswordHasher(
+    rounds=int(get_setting("BCRYPT_ROUNDS", 12)),
+    max_workers=int(get_setting("AUTH_WORKERS", 4))
+)
+login_window = int(get_setting("LOGIN_THROTTLE_WINDOW_SECONDS", 300))
+account_throttle = LoginThrottle(int(get_setting("LOGIN_MAX_FAILURES", 5)), login_window)
+client_throttle = LoginThrottle(int(get_setting("LOGIN_MAX_FAILURES_PER_CLIENT", 20)), login_window)
+
+@timed()
 def init_database():
     """Initialize database with default admin and course data if empty"""
     # Add default admin if none exists
     if admin_collection.count_documents({}) == 0:
         default_admin = {
             "username": "admin",
-            "password": bcrypt.hashpw("admin123".encode('utf-8'), bcrypt.gensalt())
+            "password": password_hasher.hash("admin123")
         }
         admin_collection.insert_one(default_admin)
 
     # Add default course data if none exists
     if course_data_collection.count_documents({}) == 0:
         default_courses = {
+            "version": 1,
             "courses": {
                 "B.Tech": {
                     "duration": "4 years",
@@ -60,40 +270,84 @@ def init_database():
         }
         course_data_collection.insert_one(default_courses)
 
+def _login_client_key():
+    """Throttling key for the client: its IP, or the whole fingerprint when no IP is forwarded"""
+    try:
+        fingerprint = get_browser_fingerprint()
+        return json.loads(fingerprint).get("ip") or fingerprint
+    except Exception:
+        return None
+
+def _login_failed(username, client_key):
+    account_throttle.failed(username)
+    if client_key:
+        client_throttle.failed(client_key)
+
+@timed()
 def verify_admin(username, password):
-    """Verify admin credentials and create session"""
-    admin = admin_collection.find_one({"username": username})
-    if admin and bcrypt.checkpw(password.encode('utf-8'), admin['password']):
-        # Create a session token
-        session_token = str(uuid.uuid4())
-        admin_collection.update_one(
-            {"username": username},
-            {"$set": {"session_token": session_token, "last_login": datetime.now()}}
-        )
-        return session_token
-    return None
+    """Verify admin credentials and create a signed session token.
+
+    Raises LoginThrottled after too many failures for the account or client,
+    and LoginServiceBusy when the password worker pool is saturated. A check
+    that times out (LoginTimedOut) counts as a failed attempt.
+    """
+    client_key = _login_client_key()
+    retry_after = max(
+        account_throttle.retry_after(username),
+        client_throttle.retry_after(client_key) if client_key else 0
+    )
+    if retry_after:
+        raise LoginThrottled(retry_after)
+
+    admin = admin_collection.find_one({"username": username}, {"password": 1})
+    stored = admin['password'] if admin else None
+    try:
+        ok = password_hasher.verify(password, stored)
+    except LoginTimedOut:
+        # Otherwise slow checks would be free retries for a guesser
+        _login_failed(username, client_key)
+        raise
+    if not ok:
+        _login_failed(username, client_key)
+        return None
+
+    account_throttle.reset(username)
+    if password_hasher.needs_rehash(stored):
+        # Upgrade to the target cost; conditional on the old hash so a concurrent change wins
+        password_hasher.rehash_later(password, lambda new_hash: admin_collection.update_one(
+            {"_id": admin["_id"], "password": stored}, {"$set": {"password": new_hash}}
+        ))
+    return admin_sessions.issue(username)
 
+@timed()
 def verify_admin_session(session_token):
-    """Verify admin session token"""
+    """Verify an admin session token in memory.
+
+    Returns the token to keep (re-signed once the sliding refresh is due) or None.
+    """
     if not session_token:
-        return False
+        return None
     try:
-        # Check if session exists and is not expired (24 hours validity)
-        admin = admin_collection.find_one({
-            "session_token": session_token,
-            "last_login": {"$gte": datetime.now() - timedelta(days=1)}
-        })
-        if admin:
-            # Update last login time to extend session
-            admin_collection.update_one(
-                {"session_token": session_token},
-                {"$set": {"last_login": datetime.now()}}
-            )
-            return True
-        return False
-    except:
-        return False
+        return admin_sessions.verify(session_token)
+    except Exception as e:
+        print(f"Error verifying admin session: {str(e)}")
+        return None
 
+@timed()
+def revoke_admin_session(session_token):
+    """Log out one admin session"""
+    return admin_sessions.revoke(session_token)
+
+def get_admin_session_stats():
+    """Get counters for signed admin session verification and password checks"""
+    return {
+        **admin_sessions.stats(),
+        "passwords": password_hasher.stats(),
+        "throttled_accounts": account_throttle.tracked(),
+        "throttled_clients": client_throttle.tracked()
+    }
+
+@timed()
 def get_browser_fingerprint():
     """Generate a simple browser fingerprint"""
     user_agent = st.request_header("User-Agent", "")
@@ -106,35 +360,24 @@ def get_browser_fingerprint():
     }
     return json.dumps(fingerprint)
 
+@timed()
 def get_or_create_user_session():
-    """Get or create a user session with improved tracking."""
+    """Get or create a user session; activity is coalesced and written once per heartbeat."""
     if 'user_id' not in st.session_state:
-        user_id = str(uuid.uuid4())
-        st.session_state.user_id = user_id
-        
-        # Create new user record
-        user_collection.insert_one({
-            'user_id': user_id,
-            'created_at': datetime.now(),
-            'last_active': datetime.now(),
-            'access_count': 1
-        })
-    else:
-        user_id = st.session_state.user_id
-        
-        # Update existing user's last active time and increment access count
-        user_collection.update_one(
-            {'user_id': user_id},
-            {
-                '$set': {'last_active': datetime.now()},
-                '$inc': {'access_count': 1}
-            }
-        )
-    
+        st.session_state.user_id = str(uuid.uuid4())
+    user_id = st.session_state.user_id
+
+    # New users are created by the tracker's upsert; existing ones get last_active/access_count bumped
+    activity_tracker.touch(user_id)
     return user_id
 
-def save_chat(user_message, bot_response):
-    """Save chat history to database with user ID and course inquiry tracking"""
+def get_activity_stats():
+    """Get counters for the coalesced user-activity tracker"""
+    return activity_tracker.stats()
+
+@timed()
+def save_chat(user_message, bot_response, timings=None, from_cache=False, fast_path=False):
+    """Save chat history to database with user ID, course inquiry tracking and response timings"""
     try:
         user_id = get_or_create_user_session()
         
@@ -151,139 +394,247 @@ def save_chat(user_message, bot_response):
             "user_id": user_id,
             "user_message": user_message,
             "bot_response": bot_response,
-            "course_inquiry": course_inquiry
+            "course_inquiry": course_inquiry,
+            "from_cache": from_cache,
+            "fast_path": fast_path
         }
-        chat_collection.insert_one(chat_data)
+        if timings:
+            chat_data.update(timings)
+        chat_writer.put(chat_data)
     except Exception as e:
         st.error("An error occurred while saving the chat. Please try again.")
         print(f"Error saving chat: {str(e)}")  # Log the error for debugging
 
-def get_chat_history(user_id=None):
-    """Get chat history, optionally filtered by user_id"""
+def get_chat_writer_stats():
+    """Get queue depth and flush latency of the background chat writer"""
+    return chat_writer.stats()
+
+IST = pytz.timezone('Asia/Kolkata')
+
+def ist_range(start_date=None, end_date=None):
+    """Turn inclusive IST calendar dates into [start, end) datetimes for range queries"""
+    start = IST.localize(datetime.combine(start_date, datetime.min.time())) if start_date else None
+    end = IST.localize(datetime.combine(end_date + timedelta(days=1), datetime.min.time())) if end_date else None
+    return start, end
+
+def _chat_query(user_id=None, start=None, end=None):
     query = {}
     if user_id:
         query["user_id"] = user_id
-    return list(chat_collection.find(query).sort("timestamp", -1))
+    if start or end:
+        query["timestamp"] = {}
+        if start:
+            query["timestamp"]["$gte"] = start
+        if end:
+            query["timestamp"]["$lt"] = end
+    return query
+
+def encode_page_token(row):
+    """Opaque keyset token pointing just past a chat row"""
+    payload = json_util.dumps({"t": row["timestamp"], "i": row["_id"]})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_page_token(token):
+    payload = json_util.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+    return payload["t"], payload["i"]
+
+def get_performance_stats():
+    """Get p50/p95/p99 latency per instrumented operation"""
+    return timings.summary()
+
+def get_prometheus_metrics():
+    """Get operation latency histograms in Prometheus text format"""
+    return timings.prometheus_text()
+
+def get_metrics_cache_stats():
+    """Get hit/miss counters for the shared dashboard metrics cache"""
+    return metrics.stats()
+
+@timed()
+def get_chat_history(user_id=None, start=None, end=None, fields=None, sort=-1, limit=None, page_token=None):
+    """Get chat history with filtering, projection, sorting and keyset paging done in MongoDB.
+
+    `start`/`end` bound the timestamp as [start, end). `fields` limits the returned
+    columns (timestamp and _id are always included for paging). Pass the token from
+    `next_page_token` as `page_token` to continue after the previous page.
+    """
+    query = _chat_query(user_id, start, end)
+    if page_token:
+        timestamp, last_id = decode_page_token(page_token)
+        op = "$lt" if sort < 0 else "$gt"
+        query = {"$and": [query, {"$or": [
+            {"timestamp": {op: timestamp}},
+            {"timestamp": timestamp, "_id": {op: last_id}}
+        ]}]}
+
+    projection = None
+    if fields:
+        projection = {field: 1 for field in fields}
+        projection["timestamp"] = 1
+
+    cursor = chat_collection.find(query, projection).sort([("timestamp", sort), ("_id", sort)])
+    if limit:
+        cursor = cursor.limit(limit)
+    return list(cursor)
+
+def next_page_token(rows, limit):
+    """Token for the page after `rows`, or None if this was the last page"""
+    if limit and len(rows) == limit:
+        return encode_page_token(rows[-1])
+    return None
+
+@timed()
+def export_chat_history(start=None, end=None, fields=None, fmt="CSV", progress=None, limit=EXPORT_MAX_ROWS):
+    """Stream up to `limit` rows of a date range of chat history to a temporary CSV/Parquet file; returns (path, rows)"""
+    query = _chat_query(start=start, end=end)
+    total = None
+    if progress:
+        # The count only drives the progress bar, so it is skipped when nobody reports progress
+        total = chat_collection.count_documents(query, **({'limit': limit} if limit else {}))
+    return export_chat_rows(chat_collection, query, fields=fields, fmt=fmt, total=total, progress=progress, limit=limit)
+
+@timed()
+def get_chat_summary(start_date, end_date, refresh=False):
+    """Message and session figures from the daily rollups, plus approximate unique chatters, for IST dates"""
+    return metrics.chat_summary(start_date, end_date, refresh)
+
+class CourseCatalogCache:
+    """In-process copy of the course catalog, reloaded only when its stored version changes.
+
+    The version is polled with a tiny projected query at most every `poll_seconds`;
+    if a change-stream watcher is running, updates from other processes invalidate
+    the cache immediately instead.
+    """
+
+    def __init__(self, collection, poll_seconds=30):
+        self.collection = collection
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._courses = None
+        self._version = None
+        self._checked_at = 0.0
+        self._watcher = None
+        self.hits = 0
+        self.misses = 0
+        self.version_checks = 0
+        self.invalidations = 0
+
+    def get(self):
+        """Return (version, courses), serving from memory whenever possible"""
+        now = time.monotonic()
+        with self._lock:
+            if self._courses is not None and now - self._checked_at < self.poll_seconds:
+                self.hits += 1
+                return self._version, self._courses
+
+        # Cheap version probe before pulling the whole catalog
+        stamp = self.collection.find_one({}, {"version": 1})
+        version = stamp.get("version", 0) if stamp else 0
+        with self._lock:
+            self.version_checks += 1
+            if self._courses is not None and version == self._version:
+                self._checked_at = now
+                self.hits += 1
+                return self._version, self._courses
+
+        data = self.collection.find_one({}, {"courses": 1, "version": 1})
+        courses = data['courses'] if data else {}
+        version = data.get("version", 0) if data else 0
+        with self._lock:
+            self.misses += 1
+            self._courses = courses
+            self._version = version
+            self._checked_at = now
+            return version, courses
+
+    def invalidate(self):
+        """Drop the cached catalog so the next read reloads it"""
+        with self._lock:
+            self._courses = None
+            self._version = None
+            self.invalidations += 1
+
+    def start_watcher(self):
+        """Invalidate on change-stream events (needs a replica set, e.g. Atlas)"""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._watcher = threading.Thread(target=self._watch, name="course-catalog-watcher", daemon=True)
+        self._watcher.start()
+
+    def _watch(self):
+        while True:
+            try:
+                with self.collection.watch() as stream:
+                    for _ in stream:
+                        self.invalidate()
+            except Exception as e:
+                # Polling still keeps the cache correct; back off and retry
+                print(f"Course catalog watcher stopped: {str(e)}")
+                time.sleep(max(self.poll_seconds, 5))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+                "version_checks": self.version_checks,
+                "invalidations": self.invalidations,
+                "poll_seconds": self.poll_seconds,
+                "watcher_running": bool(self._watcher and self._watcher.is_alive()),
+            }
 
+
+course_catalog = CourseCatalogCache(
+    course_data_collection,
+    poll_seconds=float(get_setting("COURSE_CACHE_POLL_SECONDS", 30))
+)
+if str(get_setting("COURSE_CACHE_WATCH", "false")).lower() in ("1", "true", "yes"):
+    course_catalog.start_watcher()
+
+@timed()
 def get_course_data():
-    """Get course data"""
-    data = course_data_collection.find_one()
-    return data['courses'] if data else {}
+    """Get course data (served from the in-process catalog cache)"""
+    return course_catalog.get()[1]
+
+@timed()
+def get_course_data_version():
+    """Get the version stamp of the cached course catalog"""
+    return course_catalog.get()[0]
+
+def get_course_cache_stats():
+    """Get hit/miss counters for the course catalog cache"""
+    return course_catalog.stats()
 
+@timed()
 def update_course_data(courses):
-    """Update course data"""
+    """Update course data and bump the catalog version"""
     course_data_collection.update_one(
         {}, 
-        {"$set": {"courses": courses}}, 
+        {
+            "$set": {"courses": courses, "updated_at": datetime.now()},
+            "$inc": {"version": 1}
+        },
         upsert=True
     )
+    course_catalog.invalidate()
+    answer_cache.clear()
 
-def get_user_stats():
-    """Get comprehensive user statistics."""
+@timed()
+def get_user_stats(refresh=False):
+    """Get comprehensive user statistics (shared, TTL-cached; refresh=True recomputes)."""
     try:
-        now = datetime.now(pytz.timezone('Asia/Kolkata'))
-        today_start = datetime.combine(now.date(), datetime.min.time())
-        week_start = today_start - timedelta(days=7)
-        month_start = today_start - timedelta(days=30)
-        
-        # Total users
-        total_users = user_collection.count_documents({})
-        
-        # Active users today
-        active_today = user_collection.count_documents({
-            'last_active': {'$gte': today_start}
-        })
-        
-        # New users today
-        new_users_today = user_collection.count_documents({
-            'created_at': {'$gte': today_start}
-        })
-        
-        # Active users this week
-        active_this_week = user_collection.count_documents({
-            'last_active': {'$gte': week_start}
-        })
-        
-        # Active users this month
-        active_this_month = user_collection.count_documents({
-            'last_active': {'$gte': month_start}
-        })
-        
-        # Returning users
-        returning_users = user_collection.count_documents({
-            'access_count': {'$gt': 1}
-        })
-        
-        # Daily active users for the last 7 days
-        pipeline = [
-            {
-                '$match': {
-                    'last_active': {'$gte': week_start}
-                }
-            },
-            {
-                '$group': {
-                    '_id': {
-                        '$dateToString': {
-                            'format': '%Y-%m-%d',
-                            'date': '$last_active'
-                        }
-                    },
-                    'count': {'$sum': 1}
-                }
-            },
-            {
-                '$sort': {'_id': 1}
-            }
-        ]
-        
-        daily_active = list(user_collection.aggregate(pipeline))
-        
-        # Ensure we have data for all 7 days
-        daily_active_users = []
-        for i in range(7):
-            date = (today_start - timedelta(days=i)).strftime('%Y-%m-%d')
-            count = next((item['count'] for item in daily_active if item['_id'] == date), 0)
-            daily_active_users.append({
-                'date': date,
-                'count': count
-            })
-        
-        daily_active_users.sort(key=lambda x: x['date'])
-        
-        return {
-            'total_users': total_users,
-            'active_today': active_today,
-            'new_users_today': new_users_today,
-            'active_this_week': active_this_week,
-            'active_this_month': active_this_month,
-            'returning_users': returning_users,
-            'daily_active_users': daily_active_users
-        }
+        return metrics.user_stats(refresh)
     except Exception as e:
         print(f"Error fetching user stats: {str(e)}")
         return {}
 
-def get_course_inquiry_stats():
-    """Get statistics about course inquiries"""
-    pipeline = [
-        {
-            '$match': {
-                'course_inquiry': {'$ne': None}
-            }
-        },
-        {
-            '$group': {
-                '_id': '$course_inquiry',
-                'count': {'$sum': 1}
-            }
-        },
-        {
-            '$sort': {'count': -1}
-        }
-    ]
-    
-    course_stats = list(chat_collection.aggregate(pipeline))
+@timed()
+def get_course_inquiry_stats(refresh=False):
+    """Get statistics about course inquiries from the daily course rollups"""
+    course_stats = metrics.course_inquiries(refresh)
     
     # Convert to format suitable for pie chart
     total_inquiries = sum(stat['count'] for stat in course_stats)
@@ -0,0 +1,87 @@
+import csv
+import tempfile
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+EXPORT_FIELDS = ['timestamp', 'user_id', 'user_message', 'bot_response', 'course_inquiry']
+EXPORT_CHUNK_SIZE = 5000
+
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def parquet_available():
+    return pa is not None
+
+
+def _chunks(cursor, size):
+    chunk = []
+    for document in cursor:
+        chunk.append(document)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_chat_history(collection, query, fields=None, fmt="CSV", chunk_size=EXPORT_CHUNK_SIZE, total=None, progress=None, limit=None):
+    """Stream matching chat rows to a temporary CSV/Parquet file, one cursor batch at a time.
+
+    Only `chunk_size` rows are held in memory and at most `limit` rows are written.
+    `progress(rows_written, total)` is called after each chunk. Returns
+    (path, rows_written); the caller owns the file and must delete it.
+    """
+    fields = fields or EXPORT_FIELDS
+    extension, _ = FORMATS[fmt]
+    if fmt == "Parquet" and pa is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    projection = {field: 1 for field in fields}
+    projection['_id'] = 0
+    cursor = collection.find(query, projection, batch_size=chunk_size).sort('timestamp', 1)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    handle = tempfile.NamedTemporaryFile(
+        mode="w" if fmt == "CSV" else "wb",
+        suffix=f".{extension}",
+        delete=False,
+        **({"newline": "", "encoding": "utf-8"} if fmt == "CSV" else {})
+    )
+    rows = 0
+    with handle:
+        if fmt == "CSV":
+            writer = csv.DictWriter(handle, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            for chunk in _chunks(cursor, chunk_size):
+                writer.writerows(chunk)
+                rows += len(chunk)
+                if progress:
+                    progress(rows, total)
+        else:
+            schema = pa.schema([
+                (field, pa.timestamp("ms", tz="UTC") if field == "timestamp" else pa.string())
+                for field in fields
+            ])
+            with pq.ParquetWriter(handle, schema) as writer:
+                for chunk in _chunks(cursor, chunk_size):
+                    columns = {
+                        field: [
+                            row.get(field) if field == "timestamp" or row.get(field) is None else str(row.get(field))
+                            for row in chunk
+                        ]
+                        for field in fields
+                    }
+                    writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+                    rows += len(chunk)
+                    if progress:
+                        progress(rows, total)
+    return handle.name, rows
@@ -0,0 +1,137 @@
+import re
+import threading
+from cache import normalize_question
+
+# Intent patterns, checked against the normalised question
+INTENTS = {
+    "fees": re.compile(r"\b(fee|fees|cost|costs|tuition)\b"),
+    "duration": re.compile(r"\b(how long|duration|how many years)\b"),
+    "semesters": re.compile(r"\b(how many semesters|number of semesters|no of semesters)\b"),
+    "subjects": re.compile(r"\b(subject|subjects|syllabus|papers|taught)\b"),
+}
+
+# Questions that need reasoning across courses always go to the model
+_FALL_THROUGH = re.compile(r"\b(compare|comparison|vs|versus|difference|better|best|which)\b")
+
+_ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4,
+    "fifth": 5, "sixth": 6, "seventh": 7, "eighth": 8,
+    "1st": 1, "2nd": 2, "3rd": 3, "4th": 4, "5th": 5, "6th": 6, "7th": 7, "8th": 8,
+}
+_SEMESTER_NUMBER = re.compile(r"\b(?:sem|semester) (\d+)\b")
+_SEMESTER_ORDINAL = re.compile(r"\b(\w+) (?:sem|semester)\b")
+
+
+def _semester_number(question):
+    match = _SEMESTER_NUMBER.search(question)
+    if match:
+        return int(match.group(1))
+    for word in _SEMESTER_ORDINAL.findall(question):
+        if word in _ORDINALS:
+            return _ORDINALS[word]
+    return None
+
+
+class FastPathAnswerer:
+    """Answers single-course field lookups straight from the catalog, without the LLM"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._aliases = []
+        self._version = None
+        self.seen = 0
+        self.answered = 0
+        self.by_intent = {intent: 0 for intent in INTENTS}
+
+    def _course_aliases(self, version, courses):
+        # (normalised alias pattern, course name), longest first so "b tech hons" beats "b tech"
+        with self._lock:
+            if self._version != version:
+                aliases = []
+                for course in courses:
+                    alias = normalize_question(course)
+                    if alias:
+                        aliases.append((re.compile(rf"\b{re.escape(alias)}\b"), course, len(alias)))
+                aliases.sort(key=lambda item: item[2], reverse=True)
+                self._aliases = [(pattern, course) for pattern, course, _ in aliases]
+                self._version = version
+            return self._aliases
+
+    def answer(self, version, courses, question):
+        """Templated markdown answer, or None if the question should go to the model"""
+        with self._lock:
+            self.seen += 1
+        text = normalize_question(question)
+        if _FALL_THROUGH.search(text):
+            return None
+
+        intents = [intent for intent, pattern in INTENTS.items() if pattern.search(text)]
+        if len(intents) != 1:
+            return None
+        intent = intents[0]
+
+        matched = []
+        for pattern, course in self._course_aliases(version, courses):
+            if pattern.search(text) and course not in matched:
+                matched.append(course)
+        if len(matched) != 1:
+            return None
+        course = matched[0]
+        details = courses.get(course)
+        if not isinstance(details, dict):
+            return None
+
+        reply = _render(intent, course, details, _semester_number(text))
+        if reply is not None:
+            with self._lock:
+                self.answered += 1
+                self.by_intent[intent] += 1
+        return reply
+
+    def stats(self):
+        with self._lock:
+            return {
+                "questions_seen": self.seen,
+                "answered": self.answered,
+                "fraction_handled": round(self.answered / self.seen, 3) if self.seen else 0,
+                "by_intent": dict(self.by_intent),
+            }
+
+
+def _render(intent, course, details, semester):
+    if intent == "fees":
+        if "fees" not in details:
+            return None
+        return f"💰 **{course} fees:** {details['fees']}"
+
+    if intent == "duration":
+        if "duration" not in details:
+            return None
+        reply = f"⏳ The **{course}** programme runs for **{details['duration']}**"
+        if "semesters" in details:
+            reply += f" ({details['semesters']} semesters)"
+        return reply + "."
+
+    if intent == "semesters":
+        if "semesters" not in details:
+            return None
+        return f"📅 **{course}** has **{details['semesters']} semesters**."
+
+    subjects = details.get("subjects")
+    if not isinstance(subjects, dict) or not subjects:
+        return None
+    if semester is not None:
+        key = next((k for k in subjects if re.findall(r"\d+", k) == [str(semester)]), None)
+        if key is None:
+            return None
+        selected = {key: subjects[key]}
+    else:
+        selected = subjects
+    lines = [f"📚 **{course} subjects**"]
+    for sem, names in selected.items():
+        lines.append(f"\n**{sem}**")
+        lines.extend(f"- {name}" for name in names)
+    return "\n".join(lines)
+
+
+fast_path = FastPathAnswerer()
@@ -0,0 +1,48 @@
+import hashlib
+import math
+
+# 2^12 registers: ~1.6% standard error, 4 KB per sketch
+DEFAULT_PRECISION = 12
+
+
+class HyperLogLog:
+    """Mergeable approximate distinct counter (HyperLogLog with linear-counting correction)"""
+
+    def __init__(self, p=DEFAULT_PRECISION, registers=None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+
+    def add(self, item):
+        h = int.from_bytes(hashlib.blake2b(str(item).encode('utf-8'), digest_size=8).digest(), 'big')
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Union in place: register-wise maximum"""
+        if other.p != self.p:
+            raise ValueError("Cannot merge sketches with different precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    def to_sparse(self):
+        """Non-zero registers as {"index": rank}, the shape stored in MongoDB"""
+        return {str(i): r for i, r in enumerate(self.registers) if r}
+
+    @classmethod
+    def from_sparse(cls, sparse, p=DEFAULT_PRECISION):
+        sketch = cls(p)
+        for index, rank in (sparse or {}).items():
+            sketch.registers[int(index)] = rank
+        return sketch
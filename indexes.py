@@ -0,0 +1,143 @@
+"""Declarative index registry for every collection the app queries.
+
+Usage:
+    python indexes.py apply   # create any missing indexes (idempotent)
+    python indexes.py diff    # compare the registry with the live indexes
+    python indexes.py stats   # per-index usage from $indexStats
+"""
+import sys
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient
+from pymongo.errors import OperationFailure
+
+CHAT_DB = 'university_chatbot'
+ISSUES_DB = 'hostel_maintenance'
+
+# (database, collection) -> list of index specs
+INDEXES = {
+    (CHAT_DB, 'chat_history'): [
+        {"name": "timestamp_-1__id_-1", "keys": [("timestamp", DESCENDING), ("_id", DESCENDING)]},
+        {"name": "user_id_1_timestamp_-1", "keys": [("user_id", ASCENDING), ("timestamp", DESCENDING)]},
+        {"name": "course_inquiry_1", "keys": [("course_inquiry", ASCENDING)]},
+    ],
+    (CHAT_DB, 'users'): [
+        {"name": "user_id_1", "keys": [("user_id", ASCENDING)], "unique": True},
+        {"name": "last_active_-1", "keys": [("last_active", DESCENDING)]},
+        {"name": "created_at_-1", "keys": [("created_at", DESCENDING)]},
+        {"name": "access_count_1", "keys": [("access_count", ASCENDING)]},
+    ],
+    (CHAT_DB, 'daily_course_stats'): [
+        {"name": "day_1", "keys": [("day", ASCENDING)]},
+    ],
+    (CHAT_DB, 'admins'): [
+        {"name": "username_1", "keys": [("username", ASCENDING)], "unique": True},
+    ],
+    (CHAT_DB, 'revoked_sessions'): [
+        {"name": "expires_at_ttl", "keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    ],
+    (ISSUES_DB, 'issues'): [
+        {"name": "created_at_-1", "keys": [("created_at", DESCENDING)]},
+        {"name": "type_1_category_1_created_at_-1", "keys": [("type", ASCENDING), ("category", ASCENDING), ("created_at", DESCENDING)]},
+        {"name": "category_1_created_at_-1", "keys": [("category", ASCENDING), ("created_at", DESCENDING)]},
+        {"name": "status_1_created_at_-1", "keys": [("status", ASCENDING), ("created_at", DESCENDING)]},
+        {"name": "hostel_1_floor_1", "keys": [("hostel", ASCENDING), ("floor", ASCENDING)], "sparse": True},
+        {"name": "legacy_id_1", "keys": [("legacy_id", ASCENDING)], "unique": True, "sparse": True},
+        {"name": "idempotency_key_1", "keys": [("idempotency_key", ASCENDING)], "unique": True, "sparse": True},
+    ],
+}
+
+
+# Index options that change behaviour, compared by diff_indexes; absent means False/None
+FLAG_OPTIONS = ("unique", "sparse", "hidden")
+VALUE_OPTIONS = ("expireAfterSeconds", "partialFilterExpression")
+
+
+def _options_differ(index, spec):
+    if any(bool(index.get(option)) != bool(spec.get(option)) for option in FLAG_OPTIONS):
+        return True
+    return any(index.get(option) != spec.get(option) for option in VALUE_OPTIONS)
+
+
+def _model(spec):
+    options = {key: value for key, value in spec.items() if key != "keys"}
+    return IndexModel(spec["keys"], **options)
+
+
+def ensure_indexes(client):
+    """Create every registered index that is missing; safe to run repeatedly"""
+    ensured, failed = [], []
+    for (db_name, collection_name), specs in INDEXES.items():
+        collection = client[db_name][collection_name]
+        for spec in specs:
+            try:
+                collection.create_indexes([_model(spec)])
+                ensured.append(f"{db_name}.{collection_name}.{spec['name']}")
+            except OperationFailure as e:
+                # e.g. duplicates blocking a unique index; report and keep going
+                failed.append((f"{db_name}.{collection_name}.{spec['name']}", str(e)))
+    return ensured, failed
+
+
+def diff_indexes(client):
+    """Compare the registry with live indexes: missing, changed (keys or options) and unregistered ones"""
+    report = []
+    for (db_name, collection_name), specs in INDEXES.items():
+        live = {
+            index["name"]: index
+            for index in client[db_name][collection_name].list_indexes()
+            if index["name"] != "_id_"
+        }
+        for spec in specs:
+            index = live.pop(spec["name"], None)
+            if index is None:
+                report.append(("missing", db_name, collection_name, spec["name"]))
+            elif list(index["key"].items()) != list(spec["keys"]) or _options_differ(index, spec):
+                report.append(("changed", db_name, collection_name, spec["name"]))
+        for name in live:
+            report.append(("unregistered", db_name, collection_name, name))
+    return report
+
+
+def index_stats(client):
+    """Per-index operation counts from $indexStats for every registered collection"""
+    rows = []
+    for db_name, collection_name in INDEXES:
+        for stat in client[db_name][collection_name].aggregate([{"$indexStats": {}}]):
+            rows.append({
+                "collection": f"{db_name}.{collection_name}",
+                "index": stat["name"],
+                "ops": stat["accesses"]["ops"],
+                "since": stat["accesses"]["since"],
+            })
+    return rows
+
+
+def main(argv):
+    from config import get_setting
+
+    command = argv[1] if len(argv) > 1 else "apply"
+    client = MongoClient(get_setting("MONGO_URI"))
+
+    if command == "apply":
+        ensured, failed = ensure_indexes(client)
+        print(f"Ensured {len(ensured)} indexes")
+        for name, error in failed:
+            print(f"FAILED {name}: {error}")
+        return 1 if failed else 0
+    if command == "diff":
+        report = diff_indexes(client)
+        for status, db_name, collection_name, name in report:
+            print(f"{status:<13} {db_name}.{collection_name}.{name}")
+        if not report:
+            print("Live indexes match the registry")
+        return 1 if any(status != "unregistered" for status, *_ in report) else 0
+    if command == "stats":
+        for row in sorted(index_stats(client), key=lambda row: row["ops"]):
+            print(f"{row['ops']:>10}  {row['collection']}.{row['index']}  (since {row['since']})")
+        return 0
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,117 @@
+"""Headless complaint ingestion API for hostel kiosks and mobile front-ends.
+
+    python ingest.py [port]
+
+POST /issues with a JSON body of {"issues": [...]} (or a bare list). Each
+issue uses the same fields as the Streamlit form plus an optional
+`idempotency_key`; resubmitting a key never creates a second issue.
+Requests must send the INGEST_API_KEY setting in an `X-API-Key` header; the
+server refuses to start without one.
+"""
+import hmac
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import get_setting
+from issues import ingest_issues
+
+DEFAULT_PORT = 8600
+MAX_BATCH = int(get_setting("INGEST_MAX_BATCH", 500))
+MAX_BODY_BYTES = int(get_setting("INGEST_MAX_BODY_BYTES", 2 * 1024 * 1024))
+
+
+def make_handler(collection, api_key, max_batch=MAX_BATCH):
+    """Request handler bound to an issues collection (a real or stand-in Mongo collection).
+
+    Fails closed: without an api_key every write is rejected.
+    """
+
+    class IngestHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, {"status": "ok"})
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/issues":
+                return self._reply(404, {"error": "not found"})
+            if not api_key or not hmac.compare_digest(self.headers.get("X-API-Key", ""), api_key):
+                return self._reply(401, {"error": "invalid API key"})
+
+            if self.headers.get("Content-Length") is None:
+                return self._reply(411, {"error": "Content-Length required"})
+            try:
+                length = int(self.headers["Content-Length"])
+            except ValueError:
+                length = -1
+            if length < 0:
+                return self._reply(400, {"error": "invalid Content-Length"})
+            if length > MAX_BODY_BYTES:
+                return self._reply(413, {"error": f"body larger than {MAX_BODY_BYTES} bytes"})
+            try:
+                payload = json.loads(self.rfile.read(length) or b"null")
+            except ValueError:
+                return self._reply(400, {"error": "body must be JSON"})
+
+            items = payload.get("issues") if isinstance(payload, dict) else payload
+            if not isinstance(items, list) or not items:
+                return self._reply(400, {"error": "expected a non-empty list of issues"})
+            if len(items) > max_batch:
+                return self._reply(413, {"error": f"at most {max_batch} issues per request"})
+
+            try:
+                results = ingest_issues(collection, items)
+            except Exception as e:
+                print(f"Error ingesting {len(items)} issues: {str(e)}")
+                return self._reply(503, {"error": "could not store issues, retry with the same keys"})
+
+            summary = {status: sum(1 for r in results if r["status"] == status)
+                       for status in ("created", "duplicate", "invalid", "error")}
+            self._reply(200, {**summary, "results": results})
+
+        def log_message(self, format, *args):
+            pass
+
+    return IngestHandler
+
+
+def serve(collection, api_key, host="0.0.0.0", port=DEFAULT_PORT):
+    if not api_key:
+        raise ValueError("INGEST_API_KEY must be set before the ingestion API is exposed")
+    server = ThreadingHTTPServer((host, port), make_handler(collection, api_key))
+    print(f"Accepting issues on http://{host}:{port}/issues")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv):
+    from pymongo import MongoClient
+    from indexes import ISSUES_DB, ensure_indexes
+
+    port = int(argv[1]) if len(argv) > 1 else int(get_setting("INGEST_PORT", DEFAULT_PORT))
+    api_key = get_setting("INGEST_API_KEY")
+    if not api_key:
+        print("Refusing to start: set INGEST_API_KEY so only known clients can file issues")
+        return 2
+    client = MongoClient(get_setting("MONGO_URI"))
+    # The unique idempotency_key index is what makes concurrent retries safe
+    ensure_indexes(client)
+    serve(client[ISSUES_DB]["issues"], api_key, host=get_setting("INGEST_HOST", "0.0.0.0"), port=port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,234 @@
+"""Unified complaint store: every issue lives once in the `issues` collection.
+
+Migrate the old per-type collections (hostel_issues, dept_issues,
+general_issues, admin_issues) with:
+
+    python issues.py migrate
+"""
+import base64
+import hashlib
+import sys
+import uuid
+from datetime import datetime
+import pytz
+from bson import json_util
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+IST = pytz.timezone('Asia/Kolkata')
+
+ISSUE_TYPES = ["Hostel", "Department", "General"]
+HOSTELS = ["A Block", "Narmada", "Nilgiri"]
+FLOORS = ["I", "II", "III", "IV"]
+GENERAL_CATEGORIES = ["Sports Management", "Transport Management", "Canteen Management"]
+CATEGORIES = {
+    "Hostel": ["Plumbing", "Electrical", "Civil", "HR", "Food"],
+    "Department": ["Curriculum", "Faculty", "Classroom Management", "Fee", "Placement"],
+}
+STATUSES = ["Pending", "In Progress", "Resolved"]
+
+# Fields kept for each issue type besides the common ones
+TYPE_FIELDS = {
+    "Hostel": ["hostel", "floor", "room_no"],
+    "Department": ["department"],
+    "General": ["general_category"],
+}
+COMMON_FIELDS = ["name", "reg_no", "type", "category", "details"]
+
+LEGACY_COLLECTIONS = ["admin_issues", "hostel_issues", "dept_issues", "general_issues"]
+
+
+class IssueValidationError(ValueError):
+    """Raised when an issue does not match the complaint schema"""
+
+
+def _clean(value):
+    return value.strip() if isinstance(value, str) else value
+
+
+def build_issue(data, now=None):
+    """Validate raw form/API data and return the document stored in `issues`"""
+    issue_type = _clean(data.get("type"))
+    if issue_type not in ISSUE_TYPES:
+        raise IssueValidationError(f"type must be one of {ISSUE_TYPES}")
+
+    issue = {field: _clean(data.get(field)) for field in COMMON_FIELDS + TYPE_FIELDS[issue_type]}
+    missing = [field for field in ("name", "reg_no", "details") if not issue.get(field)]
+    if issue_type in CATEGORIES and not issue.get("category"):
+        missing.append("category")
+    if issue_type == "Hostel":
+        missing += [field for field in ("hostel", "floor", "room_no") if not issue.get(field)]
+    elif issue_type == "Department" and not issue.get("department"):
+        missing.append("department")
+    elif issue_type == "General" and not issue.get("general_category"):
+        missing.append("general_category")
+    if missing:
+        raise IssueValidationError(f"missing required fields: {', '.join(missing)}")
+
+    if issue_type in CATEGORIES and issue["category"] not in CATEGORIES[issue_type]:
+        raise IssueValidationError(f"category must be one of {CATEGORIES[issue_type]}")
+    if issue_type == "Hostel":
+        if issue["hostel"] not in HOSTELS:
+            raise IssueValidationError(f"hostel must be one of {HOSTELS}")
+        if issue["floor"] not in FLOORS:
+            raise IssueValidationError(f"floor must be one of {FLOORS}")
+    if issue_type == "General" and issue["general_category"] not in GENERAL_CATEGORIES:
+        raise IssueValidationError(f"general_category must be one of {GENERAL_CATEGORIES}")
+
+    now = now or datetime.now(IST)
+    issue["status"] = "Pending"
+    issue["created_at"] = now
+    issue["updated_at"] = now
+    return issue
+
+
+def insert_issue(collection, data, idempotency_key=None):
+    """Validate and store one issue with a single write.
+
+    With an idempotency key the write is an upsert, so repeating the same
+    submission (a double-click, a retried request) stores it only once.
+    """
+    issue = build_issue(data)
+    if idempotency_key:
+        issue["idempotency_key"] = idempotency_key
+        collection.update_one({"idempotency_key": idempotency_key}, {"$setOnInsert": issue}, upsert=True)
+    else:
+        collection.insert_one(issue)
+    return issue
+
+
+def ingest_issues(collection, items, now=None):
+    """Validate a batch of issues and store the new ones with one unordered bulk_write.
+
+    Each item may carry an `idempotency_key`; items whose key is already stored
+    (or repeated earlier in the batch) are reported as duplicates rather than
+    written again. Items without a key get a fresh one. Returns one result per
+    item, in order: {"index", "status": created|duplicate|invalid, ...}.
+    """
+    now = now or datetime.now(IST)
+    results = [None] * len(items)
+    operations, positions, keys_in_batch = [], [], set()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {"index": index, "status": "invalid", "error": "issue must be an object"}
+            continue
+        key = str(item.get("idempotency_key") or uuid.uuid4().hex)
+        if key in keys_in_batch:
+            results[index] = {"index": index, "status": "duplicate", "idempotency_key": key}
+            continue
+        try:
+            issue = build_issue(item, now=now)
+        except IssueValidationError as e:
+            results[index] = {"index": index, "status": "invalid", "idempotency_key": key, "error": str(e)}
+            continue
+        keys_in_batch.add(key)
+        issue["idempotency_key"] = key
+        operations.append(UpdateOne({"idempotency_key": key}, {"$setOnInsert": issue}, upsert=True))
+        positions.append((index, key))
+
+    upserted, failed = {}, {}
+    if operations:
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            upserted = result.upserted_ids
+        except BulkWriteError as e:
+            upserted = {entry["index"]: entry["_id"] for entry in e.details.get("upserted", [])}
+            for error in e.details.get("writeErrors", []):
+                # 11000: a concurrent request upserted the same key first
+                if error.get("code") != 11000:
+                    failed[error["index"]] = error.get("errmsg", "write failed")
+
+    for op_index, (index, key) in enumerate(positions):
+        if op_index in upserted:
+            results[index] = {"index": index, "status": "created", "idempotency_key": key, "id": str(upserted[op_index])}
+        elif op_index in failed:
+            results[index] = {"index": index, "status": "error", "idempotency_key": key, "error": failed[op_index]}
+        else:
+            results[index] = {"index": index, "status": "duplicate", "idempotency_key": key}
+    return results
+
+
+def filter_options(collection, field, query=None):
+    """Distinct non-empty values of an indexed field, for filter dropdowns"""
+    return sorted(value for value in collection.distinct(field, query or {}) if value)
+
+
+def encode_page_token(issue):
+    payload = json_util.dumps({"t": issue["created_at"], "i": issue["_id"]})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_page_token(token):
+    payload = json_util.loads(base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+    return payload["t"], payload["i"]
+
+
+def find_issues(collection, query, limit=50, page_token=None):
+    """One page of issues, newest first, using a stable (created_at, _id) keyset.
+
+    Returns (issues, next_page_token); the token is None on the last page.
+    """
+    if page_token:
+        created_at, last_id = decode_page_token(page_token)
+        query = {"$and": [query, {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}}
+        ]}]}
+    issues = list(collection.find(query).sort([("created_at", -1), ("_id", -1)]).limit(limit))
+    token = encode_page_token(issues[-1]) if len(issues) == limit else None
+    return issues, token
+
+
+def content_key(document):
+    """Fingerprint of an issue's fields, used to recognise a repeated form submission"""
+    parts = [str(document.get(field) or "") for field in COMMON_FIELDS + ["hostel", "floor", "room_no", "department", "general_category"]]
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def migrate(db, batch_size=1000):
+    """Copy issues from the old collections into `issues`, once each; safe to re-run.
+
+    The old app wrote each issue to admin_issues and to its type collection
+    under the same _id, so copies are matched on that _id. Separate complaints
+    that happen to have the same text stay separate.
+    """
+    target = db["issues"]
+    seen = 0
+    # admin_issues first: it holds every issue, and any status admins may have set there
+    for name in LEGACY_COLLECTIONS:
+        operations = []
+        for document in db[name].find({}):
+            seen += 1
+            created_at = document["_id"].generation_time.astimezone(IST)
+            issue = {key: value for key, value in document.items() if key != "_id"}
+            issue.setdefault("status", "Pending")
+            issue.setdefault("created_at", created_at)
+            issue.setdefault("updated_at", created_at)
+            issue["legacy_id"] = document["_id"]
+            issue["legacy_source"] = name
+            operations.append(UpdateOne({"legacy_id": issue["legacy_id"]}, {"$setOnInsert": issue}, upsert=True))
+            if len(operations) >= batch_size:
+                target.bulk_write(operations, ordered=False)
+                operations = []
+        if operations:
+            target.bulk_write(operations, ordered=False)
+    return seen, target.count_documents({"legacy_id": {"$exists": True}})
+
+
+def main(argv):
+    from pymongo import MongoClient
+    from config import get_setting
+    from indexes import ensure_indexes
+
+    if len(argv) < 2 or argv[1] != "migrate":
+        print(__doc__)
+        return 2
+    client = MongoClient(get_setting("MONGO_URI"))
+    ensure_indexes(client)
+    seen, migrated = migrate(client["hostel_maintenance"])
+    print(f"Read {seen} legacy rows; {migrated} distinct issues now in `issues`")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
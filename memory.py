@@ -0,0 +1,89 @@
+from prompts import estimate_tokens
+
+SUMMARY_INSTRUCTION = (
+    "You maintain a short running summary of a conversation between a student and a "
+    "college assistant. Keep facts the student shared, what they asked about and any "
+    "open questions. Reply with the updated summary only, in at most 120 words."
+)
+
+
+def _turns_text(turns):
+    return "\n".join(f"Student: {user}\nAssistant: {bot}" for user, bot in turns)
+
+
+class TruncateStrategy:
+    """Drop old turns outright; the summary is left untouched"""
+
+    name = "truncate"
+
+    def fold(self, summary, turns):
+        return summary
+
+
+class SummarizeStrategy:
+    """Fold old turns into the running summary with an LLM call"""
+
+    name = "summarize"
+
+    def __init__(self, model):
+        self.model = model
+
+    def fold(self, summary, turns):
+        prompt = (
+            f"Current summary:\n{summary or '(none)'}\n\n"
+            f"Turns to fold in:\n{_turns_text(turns)}"
+        )
+        try:
+            return self.model.generate_content(prompt).text.strip()
+        except Exception as e:
+            # Keep the conversation going; just remember what was asked
+            print(f"Error summarising conversation: {str(e)}")
+            asked = "; ".join(user for user, _ in turns)
+            return f"{summary} Earlier the student asked: {asked}".strip()
+
+
+class ConversationMemory:
+    """Recent turns kept verbatim within turn/token limits, older ones folded into a summary"""
+
+    def __init__(self, strategy, max_turns=6, max_tokens=2000):
+        self.strategy = strategy
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.turns = []  # (user message, bot response) pairs, oldest first
+        self.summary = ""
+
+    def add(self, user_message, bot_response):
+        self.turns.append((user_message, bot_response))
+        self._enforce_limits()
+
+    def tokens(self):
+        return estimate_tokens(self.summary) + sum(
+            estimate_tokens(user) + estimate_tokens(bot) for user, bot in self.turns
+        )
+
+    def _enforce_limits(self):
+        if len(self.turns) <= self.max_turns and self.tokens() <= self.max_tokens:
+            return
+        # Evict down to half the turn limit so folding happens in batches, not every turn.
+        # The latest turn is always kept, even if it alone exceeds the token limit.
+        keep = max(1, self.max_turns // 2)
+        evicted = []
+        while len(self.turns) > 1 and (len(self.turns) > keep or self.tokens() > self.max_tokens):
+            evicted.append(self.turns.pop(0))
+        if evicted:
+            self.summary = self.strategy.fold(self.summary, evicted)
+
+    def history(self):
+        """Chat history in the format expected by GenerativeModel.start_chat"""
+        history = []
+        if self.summary:
+            history.append({"role": "user", "parts": [f"Summary of our earlier conversation: {self.summary}"]})
+            history.append({"role": "model", "parts": ["Thanks, I'll keep that in mind."]})
+        for user, bot in self.turns:
+            history.append({"role": "user", "parts": [user]})
+            history.append({"role": "model", "parts": [bot]})
+        return history
+
+    def text(self):
+        """Plain text of the summary and kept turns, for prompt size reporting"""
+        return f"{self.summary}\n{_turns_text(self.turns)}".strip()
@@ -0,0 +1,118 @@
+import threading
+from datetime import datetime, timedelta
+import pytz
+from cache import LRUCache, MISSING
+
+IST = pytz.timezone('Asia/Kolkata')
+
+
+class MetricsService:
+    """Dashboard figures computed with at most one query per collection.
+
+    Results are shared by every admin session in the process through a TTL
+    cache keyed by metric name and parameters; concurrent misses for the same
+    key wait for a single computation instead of each running the query.
+    """
+
+    def __init__(self, user_collection, chat_collection, rollups, sketches, ttl=60):
+        self.users = user_collection
+        self.chats = chat_collection
+        self.rollups = rollups
+        self.sketches = sketches
+        self.cache = LRUCache(maxsize=256, ttl=ttl)
+        self._key_locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _cached(self, key, compute, refresh=False):
+        if not refresh:
+            value = self.cache.get(key)
+            if value is not MISSING:
+                return value
+        with self._locks_guard:
+            lock = self._key_locks.setdefault(key, threading.Lock())
+        with lock:
+            if not refresh:
+                # Another session may have computed it while we waited
+                value = self.cache.get(key)
+                if value is not MISSING:
+                    return value
+            value = compute()
+            self.cache.set(key, value)
+            return value
+
+    def user_stats(self, refresh=False):
+        today = datetime.now(IST).date()
+        return self._cached(("user_stats", today), lambda: self._user_stats(today), refresh)
+
+    def _user_stats(self, today):
+        # DAU/WAU/MAU are unions of per-day activity sketches: correct for past days, fixed cost per day.
+        # The month's sketches are read once and the week and daily figures taken from them.
+        week_start, month_start = today - timedelta(days=6), today - timedelta(days=29)
+        month = self.sketches.load(month_start, today)
+        daily_active_users = self.sketches.daily(week_start, today, loaded=month)
+        active_this_week = self.sketches.unique(week_start, today, loaded=month)
+        active_this_month = self.sketches.unique(month_start, today, loaded=month)
+
+        users = list(self.users.aggregate([
+            {'$facet': {
+                'returning_users': [{'$match': {'access_count': {'$gt': 1}}}, {'$count': 'n'}],
+                'any_user': [{'$limit': 1}, {'$project': {'_id': 1}}]
+            }}
+        ]))[0]
+
+        daily = list(self.rollups.daily.aggregate([
+            {'$facet': {
+                'total_users': [{'$group': {'_id': None, 'n': {'$sum': '$new_users'}}}],
+                'new_users_today': [{'$match': {'_id': today.isoformat()}}, {'$project': {'n': '$new_users'}}]
+            }}
+        ]))[0]
+
+        def first(facet):
+            return (facet[0].get('n') or 0) if facet else 0
+
+        total_users = first(daily['total_users'])
+        return {
+            'total_users': total_users,
+            'active_today': daily_active_users[-1]['count'],
+            'new_users_today': first(daily['new_users_today']),
+            'active_this_week': active_this_week,
+            'active_this_month': active_this_month,
+            'returning_users': first(users['returning_users']),
+            'daily_active_users': daily_active_users,
+            # Users existed before the rollups did, so `rollups.py backfill` has not been run
+            'needs_backfill': total_users == 0 and bool(users['any_user'])
+        }
+
+    def chat_summary(self, start_date, end_date, refresh=False):
+        def compute():
+            # Session fields are precomputed by `rollups.py sessions`; this only reads them
+            days = self.rollups.daily.aggregate([
+                {'$match': {'_id': {'$gte': start_date.isoformat(), '$lte': end_date.isoformat()}}},
+                {'$group': {
+                    '_id': None,
+                    'messages': {'$sum': '$messages'},
+                    'sessions': {'$sum': '$sessions'},
+                    'session_minutes': {'$sum': '$session_minutes'},
+                    'session_messages': {'$sum': '$session_messages'},
+                    'sessions_updated_at': {'$max': '$sessions_updated_at'}
+                }}
+            ])
+            days = next(days, {})
+            sessions = days.get('sessions', 0)
+            return {
+                'messages': days.get('messages', 0),
+                'sessions': sessions,
+                'avg_session_minutes': round(days.get('session_minutes', 0) / sessions, 1) if sessions else 0,
+                'messages_per_session': round(days.get('session_messages', 0) / sessions, 1) if sessions else 0,
+                'sessions_updated_at': days.get('sessions_updated_at'),
+                # Union of the day sketches: fixed cost per day instead of a scan of chat_history
+                'unique_users': self.sketches.unique(start_date, end_date)
+            }
+        return self._cached(("chat_summary", start_date, end_date), compute, refresh)
+
+    def course_inquiries(self, refresh=False):
+        return self._cached(("course_inquiries",), self.rollups.course_totals, refresh)
+
+    def stats(self):
+        return self.cache.stats()
+
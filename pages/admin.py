@@ -1,15 +1,37 @@
 import streamlit as st
 import pandas as pd
-from pymongo import MongoClient
 from database import (
+    get_issues_db,
+    get_pool_stats,
+    get_course_cache_stats,
+    get_chat_writer_stats,
+    get_activity_stats,
+    get_metrics_cache_stats,
+    get_performance_stats,
+    get_prometheus_metrics,
     verify_admin,
     verify_admin_session,
+    revoke_admin_session,
+    get_admin_session_stats,
     get_chat_history,
+    get_chat_summary,
+    export_chat_history,
+    EXPORT_MAX_ROWS,
+    next_page_token,
+    ist_range,
     get_course_data,
+    get_course_data_version,
     update_course_data,
     get_user_stats,
     get_course_inquiry_stats
 )
+from prompts import compile_system_prompt, PROMPT_TOKEN_BUDGET
+from cache import answer_cache
+from fastpath import fast_path
+from passwords import LoginThrottled, LoginServiceBusy
+from issues import filter_options, find_issues
+from export import EXPORT_FIELDS, FORMATS as EXPORT_FORMATS, parquet_available
+import os
 import json
 from datetime import datetime, timedelta
 import streamlit.components.v1 as components
@@ -134,6 +156,10 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+# Rows per page in the Chat Analytics and issue tables
+CHAT_PAGE_SIZE = 50
+ISSUE_PAGE_SIZE = 50
+
 def show_login():
     st.markdown("""
         <div class="login-container">
@@ -147,13 +173,18 @@ def show_login():
         submit = st.form_submit_button("Login")
         
         if submit:
-            session_token = verify_admin(username, password)
+            try:
+                session_token = verify_admin(username, password)
+            except (LoginThrottled, LoginServiceBusy) as e:
+                st.error(str(e))
+                session_token = None
+            else:
+                if not session_token:
+                    st.error("Invalid credentials")
             if session_token:
                 st.session_state['admin_session_token'] = session_token
                 st.session_state['issue_type'] = issue_type 
                 st.rerun()
-            else:
-                st.error("Invalid credentials")
     
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -167,17 +198,35 @@ def status_light(status):
     else:
         return "⚪ Not Set"
     
-def admin_issues():
-    # MongoDB connection
-    MONGO_URI = st.secrets["MONGO_URI"]
-    client = MongoClient(MONGO_URI)
-    db = client["hostel_maintenance"]
+def show_issues(query, title=None, empty_message="⚠ No issues found.", key="issues"):
+    """Render issues matching an indexed query, with filters and paging done in MongoDB"""
+    collection = get_issues_db()["issues"]
+
+    if title:
+        st.title(title)
 
-    # Fetch issues from admin collection
-    admin_issues_data = list(db["admin_issues"].find({}, {"_id": 0}))
+    # Filter options come from distinct() on indexed fields, not from loaded rows
+    issue_type_options = ["All"] + filter_options(collection, "type", query)
+    issue_type_filter = st.selectbox("🔎 Filter by Type", issue_type_options, key=f"{key}_type")
+    if issue_type_filter != "All":
+        query = {**query, "type": issue_type_filter}
 
-    if admin_issues_data:
-        df = pd.DataFrame(admin_issues_data)
+    category_options = ["All"] + filter_options(collection, "category", query)
+    category_filter = st.selectbox("📂 Filter by Category", category_options, key=f"{key}_category")
+    if category_filter != "All":
+        query = {**query, "category": category_filter}
+
+    # Keyset paging; restart from the first page whenever the filters change
+    page_key = (key, issue_type_filter, category_filter)
+    if st.session_state.get("issue_page_key") != page_key:
+        st.session_state["issue_page_key"] = page_key
+        st.session_state["issue_page_tokens"] = [None]
+    tokens = st.session_state["issue_page_tokens"]
+
+    issues, next_token = find_issues(collection, query, limit=ISSUE_PAGE_SIZE, page_token=tokens[-1])
+
+    if issues:
+        df = pd.DataFrame(issues).drop(columns=["_id", "legacy_id", "legacy_source", "idempotency_key"], errors="ignore")
 
         # Add colored status as new column
         if "status" in df.columns:
@@ -185,24 +234,27 @@ def admin_issues():
         else:
             df["Status"] = ["⚪ Not Set"] * len(df)
 
-        # Optional Filters
-        issue_type_options = ["All"] + sorted(df["type"].dropna().unique())
-        category_options = ["All"] + sorted(df["category"].dropna().unique())
-
-        issue_type_filter = st.selectbox("🔎 Filter by Type", issue_type_options)
-        category_filter = st.selectbox("📂 Filter by Category", category_options)
-
-        # Apply Filters
-        if issue_type_filter != "All":
-            df = df[df["type"] == issue_type_filter]
-        if category_filter != "All":
-            df = df[df["category"] == category_filter]
-
         # Show final table
-        st.markdown("### 📋 Submitted Issues")
+        total = collection.count_documents(query)
+        st.markdown(f"### 📋 Submitted Issues ({total})")
         st.dataframe(df)  # show full df including emoji Status
+
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            if len(tokens) > 1 and st.button("⬅ Newer", key=f"{key}_prev_page"):
+                tokens.pop()
+                st.rerun()
+        with page_col:
+            st.caption(f"Page {len(tokens)} of {max(1, -(-total // ISSUE_PAGE_SIZE))}")
+        with next_col:
+            if next_token and st.button("Older ➡", key=f"{key}_next_page"):
+                tokens.append(next_token)
+                st.rerun()
     else:
-        st.warning("⚠ No issues found in the Admin Database.")
+        st.warning(empty_message)
+
+def admin_issues():
+    show_issues({}, empty_message="⚠ No issues found in the Admin Database.", key="admin_issues")
 
 def show_admin_dashboard():
     # Header with logout button
@@ -223,7 +275,7 @@ def show_admin_dashboard():
         st.markdown('<div class="sidebar-header">🎯 Navigation</div>', unsafe_allow_html=True)
         page = st.radio(
             "Navigation Menu",
-            ["Overview", "Chat Analytics", "Course Data Management","Admin issues"],
+            ["Overview", "Chat Analytics", "Course Data Management","Admin issues", "Performance"],
             label_visibility="collapsed"
         )
         st.markdown('</div>', unsafe_allow_html=True)
@@ -232,9 +284,27 @@ def show_admin_dashboard():
         st.markdown('<div class="sidebar-content">', unsafe_allow_html=True)
         st.markdown('<div class="sidebar-header">⚙ Admin Actions</div>', unsafe_allow_html=True)
         if st.button("🚪 Logout", key="logout_btn"):
+            revoke_admin_session(st.session_state['admin_session_token'])
             st.session_state['admin_session_token'] = None
             st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
+
+        with st.expander("🔐 Admin Sessions"):
+            st.json(get_admin_session_stats())
+        with st.expander("🔌 Connection Pool"):
+            st.json(get_pool_stats())
+        with st.expander("🗂 Course Catalog Cache"):
+            st.json(get_course_cache_stats())
+        with st.expander("💬 Answer Cache"):
+            st.json(answer_cache.stats())
+        with st.expander("⚡ Fast-Path Answers"):
+            st.json(fast_path.stats())
+        with st.expander("📝 Chat Log Writer"):
+            st.json(get_chat_writer_stats())
+        with st.expander("👣 Activity Tracker"):
+            st.json(get_activity_stats())
+        with st.expander("📊 Metrics Cache"):
+            st.json(get_metrics_cache_stats())
     
     if page == "Overview":
         show_overview()
@@ -242,14 +312,66 @@ def show_admin_dashboard():
         show_chat_analytics()
     elif page == "Admin issues":
         admin_issues()
+    elif page == "Performance":
+        show_performance()
     else:
         show_course_management()
 
 
+def show_performance():
+    """Latency percentiles per instrumented operation in this process"""
+    st.markdown('<div class="section-title">⏱ Performance</div>', unsafe_allow_html=True)
+    st.caption("Timed since this server process started; each Streamlit process keeps its own figures.")
+    if st.button("🔄 Refresh", key="refresh_performance"):
+        st.rerun()
+
+    stats = get_performance_stats()
+    if not stats:
+        st.info("No operations timed yet.")
+        return
+
+    df = pd.DataFrame(stats)
+    st.dataframe(
+        df.rename(columns={
+            "operation": "Operation", "count": "Calls", "errors": "Errors",
+            "p50_ms": "p50 (ms)", "p95_ms": "p95 (ms)", "p99_ms": "p99 (ms)",
+            "max_ms": "Max (ms)", "total_s": "Total (s)"
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    fig = px.bar(
+        df.head(15).melt(id_vars="operation", value_vars=["p50_ms", "p95_ms", "p99_ms"], var_name="percentile", value_name="ms"),
+        x="ms", y="operation", color="percentile", barmode="group", orientation="h",
+        title="Slowest operations by p95"
+    )
+    fig.update_layout(yaxis={"categoryorder": "total ascending"})
+    st.plotly_chart(fig, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**🔌 Connection pool**")
+        st.json(get_pool_stats())
+    with col2:
+        st.markdown("**📈 Prometheus export**")
+        metrics_text = get_prometheus_metrics()
+        st.download_button("⬇ Download metrics", metrics_text, file_name="metrics.prom", mime="text/plain")
+        with st.expander("Show metrics text"):
+            st.code(metrics_text, language="text")
+
 def show_overview():
+    # Figures are cached and shared across admins; "Refresh now" recomputes them
+    refresh_col, _ = st.columns([1, 5])
+    with refresh_col:
+        refresh = st.button("🔄 Refresh now", key="refresh_metrics")
+
     # Get user statistics
-    user_stats = get_user_stats()
-    course_stats = get_course_inquiry_stats()
+    user_stats = get_user_stats(refresh)
+    course_stats = get_course_inquiry_stats(refresh)
+    if user_stats.get("needs_backfill"):
+        st.info("User and chat totals come from daily rollups, which have not been built for existing data yet. "
+                "Run `python rollups.py backfill` once to populate them.")
     
     # User Statistics Section
     st.markdown("""
@@ -262,7 +384,7 @@ def show_overview():
                 </div>
                 <div class="metric-card" style="background-color: #FFB6C1;">
                     <div class="metric-value">{}</div>
-                    <div class="metric-label">✨ Active Today</div>
+                    <div class="metric-label">✨ Active Today (DAU)</div>
                 </div>
                 <div class="metric-card" style="background-color: #90EE90;">
                     <div class="metric-value">{}</div>
@@ -274,11 +396,11 @@ def show_overview():
                 </div>
                 <div class="metric-card" style="background-color: #FFEBEE;">
                     <div class="metric-value">{}</div>
-                    <div class="metric-label">📅 Active This Week</div>
+                    <div class="metric-label">📅 Active This Week (WAU)</div>
                 </div>
                 <div class="metric-card" style="background-color: #F3E5F5;">
                     <div class="metric-value">{}</div>
-                    <div class="metric-label">📆 Active This Month</div>
+                    <div class="metric-label">📆 Active This Month (MAU)</div>
                 </div>
                 <div class="metric-card" style="background-color: #E0F7FA;">
                     <div class="metric-value">{}%</div>
@@ -395,28 +517,26 @@ def show_overview():
     
     st.markdown("</div></div>", unsafe_allow_html=True)
     
-    # Get chat history
-    chats = get_chat_history()
-    df = pd.DataFrame(chats)
+    # Chat metrics for the range come from the daily rollups
+    summary = get_chat_summary(start_date, end_date, refresh)
     
-    if not df.empty:
-        df['date'] = pd.to_datetime(df['timestamp']).dt.date
-        filtered_df = df[
-            (df['date'] >= start_date) & 
-            (df['date'] <= end_date)
-        ]
-        
+    if summary['messages']:
         # Chat Metrics
         st.markdown("""
             <div class="section-container">
                 <div class="section-title">💬 Chat Metrics</div>
         """, unsafe_allow_html=True)
         
+        # Session figures are "—" rather than 0 until the rollup job has computed them
+        def session_figure(value):
+            return value if summary['sessions_updated_at'] else "—"
+
         metrics = [
-            (len(filtered_df['date'].unique()), "📊 Total Sessions", "#E3F2FD"),
-            (len(filtered_df), "💬 Total Messages", "#F3E5F5"),
-            (9, "⏱ Average Session Time (Mins)", "#E8F5E9"),
-            (len(filtered_df['user_id'].unique()) if 'user_id' in filtered_df.columns else 0, "👥 Unique Chatters", "#FFF3E0")
+            (session_figure(summary['sessions']), "📊 Total Sessions", "#E3F2FD"),
+            (summary['messages'], "💬 Total Messages", "#F3E5F5"),
+            (session_figure(summary['avg_session_minutes']), "⏱ Average Session Time (Mins)", "#E8F5E9"),
+            (summary['unique_users'], "👥 Unique Chatters", "#FFF3E0"),
+            (session_figure(summary['messages_per_session']), "🗨 Messages per Session", "#FCE4EC")
         ]
         
         # Create two columns for the metrics
@@ -441,6 +561,11 @@ def show_overview():
                 """, unsafe_allow_html=True)
         
         st.markdown("</div>", unsafe_allow_html=True)
+        if summary['sessions_updated_at']:
+            updated = pytz.utc.localize(summary['sessions_updated_at']).astimezone(pytz.timezone('Asia/Kolkata'))
+            st.caption(f"Session figures as of {updated.strftime('%d %b %H:%M')} IST")
+        else:
+            st.caption("Session figures have not been computed yet: run `python rollups.py backfill`, then schedule `python rollups.py sessions`.")
     else:
         st.info("No chat history available")
 
@@ -471,16 +596,22 @@ def show_chat_analytics():
     
     st.markdown("</div>", unsafe_allow_html=True)
     
-    # Get chat history
-    chats = get_chat_history()
-    df = pd.DataFrame(chats)
+    # Fetch only the page and columns on display; paging is keyset-based in MongoDB
+    start, end = ist_range(start_date, end_date)
+    page_key = (start_date, end_date)
+    if st.session_state.get('chat_page_key') != page_key:
+        st.session_state['chat_page_key'] = page_key
+        st.session_state['chat_page_tokens'] = [None]
+    tokens = st.session_state['chat_page_tokens']
+
+    rows = get_chat_history(
+        start=start, end=end,
+        fields=['timestamp', 'user_message', 'bot_response'],
+        limit=CHAT_PAGE_SIZE, page_token=tokens[-1]
+    )
     
-    if not df.empty:
-        df['date'] = pd.to_datetime(df['timestamp']).dt.date
-        filtered_df = df[
-            (df['date'] >= start_date) & 
-            (df['date'] <= end_date)
-        ]
+    if rows:
+        df = pd.DataFrame(rows).drop(columns=['_id'])
         
         # Chat history in a more modern table
         st.markdown("""
@@ -489,30 +620,92 @@ def show_chat_analytics():
         """, unsafe_allow_html=True)
         
         st.dataframe(
-            filtered_df[['timestamp', 'user_message', 'bot_response']]
-            .sort_values('timestamp', ascending=False)
-            .head(50),
+            df[['timestamp', 'user_message', 'bot_response']],
             use_container_width=True
         )
+
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            if len(tokens) > 1 and st.button("⬅ Newer", key="chat_prev_page"):
+                tokens.pop()
+                st.rerun()
+        with page_col:
+            st.caption(f"Page {len(tokens)}")
+        with next_col:
+            token = next_page_token(rows, CHAT_PAGE_SIZE)
+            if token and st.button("Older ➡", key="chat_next_page"):
+                tokens.append(token)
+                st.rerun()
         
-        # Download button with better styling
+        # Export is streamed from a cursor into a temp file, never a full DataFrame
         st.markdown("""
             <div style="margin-top: 15px;">
         """, unsafe_allow_html=True)
-        csv = filtered_df.to_csv(index=False)
-        st.download_button(
-            "📥 Download Chat History",
-            csv,
-            "chat_history.csv",
-            "text/csv",
-            key='download-csv'
-        )
+        show_chat_export(start, end, start_date, end_date)
         st.markdown("</div></div>", unsafe_allow_html=True)
         
     else:
         st.info("No chat history available for the selected date range")
 
 
+def show_chat_export(start, end, start_date, end_date):
+    formats = list(EXPORT_FORMATS) if parquet_available() else ["CSV"]
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        fmt = st.selectbox("Format", formats, key="export_format")
+    with col2:
+        fields = st.multiselect("Columns", EXPORT_FIELDS, default=EXPORT_FIELDS, key="export_fields")
+
+    if not fields:
+        st.info("Select at least one column to export")
+        return
+
+    # A prepared file belongs to one range, format and column set; drop it when they change
+    request = (start_date, end_date, fmt, tuple(fields))
+    export = st.session_state.get('chat_export')
+    if export and export['request'] != request:
+        _discard_export()
+        export = None
+
+    if st.button("📦 Prepare Export", key="prepare-export"):
+        _discard_export()
+        bar = st.progress(0.0, text="Exporting chat history...")
+        def progress(rows, total):
+            bar.progress(min(rows / total, 1.0) if total else 1.0, text=f"Exported {rows:,} of {total:,} rows")
+
+        path, rows = export_chat_history(start, end, fields=fields, fmt=fmt, progress=progress)
+        bar.progress(1.0, text=f"Exported {rows:,} rows")
+        export = st.session_state['chat_export'] = {
+            'request': request, 'path': path, 'rows': rows,
+            'name': f"chat_history_{start_date}_{end_date}.{EXPORT_FORMATS[fmt][0]}"
+        }
+
+    if export and os.path.exists(export['path']):
+        st.caption(f"{export['rows']:,} rows ready")
+
+        def read_export(path=export['path']):
+            # Deferred to the click, so reruns never load the file
+            with open(path, 'rb') as f:
+                return f.read()
+
+        st.download_button(
+            "📥 Download Chat History",
+            read_export,
+            export['name'],
+            EXPORT_FORMATS[fmt][1],
+            key='download-export',
+            on_click="ignore"
+        )
+    st.caption(f"Exports include at most the first {EXPORT_MAX_ROWS:,} rows of the range; narrow the dates for more.")
+
+
+def _discard_export():
+    """Delete this session's prepared export file, if any"""
+    export = st.session_state.pop('chat_export', None)
+    if export and os.path.exists(export['path']):
+        os.remove(export['path'])
+
+
 def show_course_management():
     st.header(" Data Management")
     
@@ -526,6 +719,16 @@ def show_course_management():
         </div>
     """, unsafe_allow_html=True)
     
+    # Size of the system instruction compiled from this catalog version
+    compiled = compile_system_prompt(get_course_data_version(), courses)
+    st.caption(
+        f"🧮 System prompt ≈ {compiled.tokens} tokens "
+        f"(instructions {compiled.parts['instructions']}, course list {compiled.parts['catalog']}) "
+        f"of a {PROMPT_TOKEN_BUDGET} token budget"
+    )
+    if compiled.tokens > PROMPT_TOKEN_BUDGET:
+        st.warning("⚠ The compiled prompt is over budget; consider trimming the course data.")
+
     # Convert to formatted string for editing
     courses_str = json.dumps(courses, indent=2)
     
@@ -563,111 +766,29 @@ def show_course_management():
     
 
 def show_mgt_page():
-    MONGO_URI = st.secrets["MONGO_URI"]
-    client = MongoClient(MONGO_URI)
-    db = client["hostel_maintenance"]
-
-    admin_issues = list(db["hostel_issues"].find({}, {"_id": 0}))
-    if admin_issues:
-        df = pd.DataFrame(admin_issues)
-
-        st.title("Hostel Management Issues")
-
-        # Add colored status
-        if "status" in df.columns:
-            df["Status"] = df["status"].apply(status_light)
-        else:
-            df["Status"] = ["⚪ Not Set"] * len(df)
-
-        # Optional Filters
-        issue_type_filter = st.selectbox("🔎 Filter by Type", ["All"] + sorted(df["type"].dropna().unique()))
-        category_filter = st.selectbox("📂 Filter by Category", ["All"] + sorted(df["category"].dropna().unique()))
-
-        # Apply Filters
-        if issue_type_filter != "All":
-            df = df[df["type"] == issue_type_filter]
-        if category_filter != "All":
-            df = df[df["category"] == category_filter]
-
-        # Show final table
-        st.markdown("### 📋 Submitted Hostel Issues")
-        st.dataframe(df)
-    else:
-        st.warning("⚠ No issues found in the Hostel Issues Database.")
+    show_issues(
+        {"type": "Hostel"},
+        title="Hostel Management Issues",
+        empty_message="⚠ No issues found in the Hostel Issues Database.",
+        key="hostel_issues"
+    )
         
 
 def show_elec_page():
-    MONGO_URI = st.secrets["MONGO_URI"]
-    client = MongoClient(MONGO_URI)
-    db = client["hostel_maintenance"]
-
-    # Fetching Electrical Issues from both collections
-    hostel_issues = list(db["hostel_issues"].find({"category": "Electrical"}, {"_id": 0}))
-    dept_issues = list(db["dept_issues"].find({"category": "Electrical"}, {"_id": 0}))
-    # general_issues
-    gen_issues = list(db["dept_issues"].find({"category": "Electrical"}, {"_id": 0}))
-
-    # Combine both lists into one DataFrame
-    all_issues = hostel_issues + dept_issues + gen_issues
-    df = pd.DataFrame(all_issues)
-
-    if not df.empty:
-        st.title("Electrical Issues")
-         # Add colored status
-        if "status" in df.columns:
-            df["Status"] = df["status"].apply(status_light)
-        else:
-            df["Status"] = ["⚪ Not Set"] * len(df)
-        # Add filters for issue type and category
-        issue_type_filter = st.selectbox("Filter by Type", ["All"] + list(df["type"].unique()))
-        category_filter = st.selectbox("Filter by Category", ["All"] + list(df["category"].unique()))
-    
-        # Apply filters to DataFrame
-        if issue_type_filter != "All":
-            df = df[df["type"] == issue_type_filter]
-        if category_filter != "All":
-            df = df[df["category"] == category_filter]
-    
-        # Display filtered data
-        st.dataframe(df)
-    else:
-        st.warning("⚠ No electrical issues found in Hostel or Department.")
+    show_issues(
+        {"category": "Electrical"},
+        title="Electrical Issues",
+        empty_message="⚠ No electrical issues found in Hostel or Department.",
+        key="electrical_issues"
+    )
 
 def show_civil_page():
-    MONGO_URI = st.secrets["MONGO_URI"]
-    client = MongoClient(MONGO_URI)
-    db = client["hostel_maintenance"]
-
-    # Fetching Electrical Issues from both collections
-    hostel_issues = list(db["hostel_issues"].find({"category": "Civil"}, {"_id": 0}))
-    dept_issues = list(db["dept_issues"].find({"category": "Civil"}, {"_id": 0}))
-    # general_issues
-    gen_issues = list(db["dept_issues"].find({"category": "Civil"}, {"_id": 0}))
-
-    # Combine both lists into one DataFrame
-    all_issues = hostel_issues + dept_issues + gen_issues
-    df = pd.DataFrame(all_issues)
-
-    if not df.empty:
-        st.title("Civil Issues")
-        if "status" in df.columns:
-            df["Status"] = df["status"].apply(status_light)
-        else:
-            df["Status"] = ["⚪ Not Set"] * len(df)
-        # Add filters for issue type and category
-        issue_type_filter = st.selectbox("Filter by Type", ["All"] + list(df["type"].unique()))
-        category_filter = st.selectbox("Filter by Category", ["All"] + list(df["category"].unique()))
-    
-        # Apply filters to DataFrame
-        if issue_type_filter != "All":
-            df = df[df["type"] == issue_type_filter]
-        if category_filter != "All":
-            df = df[df["category"] == category_filter]
-    
-        # Display filtered data
-        st.dataframe(df)
-    else:
-        st.warning("⚠ No Civil issues found in Hostel or Department.")
+    show_issues(
+        {"category": "Civil"},
+        title="Civil Issues",
+        empty_message="⚠ No Civil issues found in Hostel or Department.",
+        key="civil_issues"
+    )
 
 
 def admin_page():
@@ -675,10 +796,13 @@ def admin_page():
     if 'admin_session_token' not in st.session_state:
         st.session_state['admin_session_token'] = None
     
-    # Verify session token
-    if not st.session_state['admin_session_token'] or not verify_admin_session(st.session_state['admin_session_token']):
+    # Verify session token (in memory; a refreshed token replaces the old one)
+    session_token = verify_admin_session(st.session_state['admin_session_token'])
+    if not session_token:
+        st.session_state['admin_session_token'] = None
         show_login()
     else:
+        st.session_state['admin_session_token'] = session_token
         if "issue_type" in st.session_state:
           issue_type = st.session_state["issue_type"]
           if issue_type == "Admin":
@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import bcrypt
+
+
+class LoginThrottled(Exception):
+    """Raised when too many failed logins came from an account or client"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Too many failed logins; try again in {int(retry_after) + 1} seconds")
+        self.retry_after = retry_after
+
+
+class LoginServiceBusy(Exception):
+    """Raised when the password worker pool is saturated"""
+
+
+class LoginTimedOut(LoginServiceBusy):
+    """Raised when a password check did not finish within the hasher's timeout"""
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification on a small, bounded worker pool.
+
+    bcrypt releases the GIL, so verification runs off the Streamlit script
+    thread without blocking other sessions, while `max_workers` caps how many
+    hashes burn CPU at once and `max_pending` sheds load beyond that.
+    Hashes below the target `rounds` are upgraded after a successful login.
+    """
+
+    def __init__(self, rounds=12, max_workers=4, max_pending=32, timeout=10):
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        # Compared against when the account does not exist, so both paths cost the same
+        self._dummy_hash = bcrypt.hashpw(b"not-a-password", bcrypt.gensalt(rounds))
+        self.verifications = 0
+        self.rehashed = 0
+        self.rejected_busy = 0
+        self.timed_out = 0
+        self.total_verify_ms = 0.0
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected_busy += 1
+            raise LoginServiceBusy("Login service is busy; please retry")
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _wait(self, future):
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            # Drops the job if it is still queued; a running bcrypt call cannot be
+            # interrupted and keeps its pending slot until it finishes
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise LoginTimedOut("Login took too long; please try again")
+
+    def hash(self, password):
+        return self._wait(self._run(lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds))))
+
+    def verify(self, password, hashed):
+        """Check a password against a stored hash (or a dummy one when hashed is None).
+
+        Raises LoginTimedOut when the check takes longer than `timeout`.
+        """
+        started = time.perf_counter()
+        ok = self._wait(self._run(bcrypt.checkpw, password.encode('utf-8'), hashed or self._dummy_hash))
+        with self._lock:
+            self.verifications += 1
+            self.total_verify_ms += (time.perf_counter() - started) * 1000
+        return ok and hashed is not None
+
+    def needs_rehash(self, hashed):
+        try:
+            return int(hashed.split(b"$")[2]) < self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def rehash_later(self, password, on_hash):
+        """Hash at the target cost in the background and hand the result to on_hash"""
+        def task():
+            on_hash(bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds)))
+            with self._lock:
+                self.rehashed += 1
+
+        def report(future):
+            if future.exception():
+                print(f"Error upgrading password hash: {str(future.exception())}")
+
+        try:
+            self._run(task).add_done_callback(report)
+        except LoginServiceBusy:
+            pass  # upgrade on a later login
+
+    def stats(self):
+        with self._lock:
+            return {
+                "target_rounds": self.rounds,
+                "verifications": self.verifications,
+                "avg_verify_ms": round(self.total_verify_ms / self.verifications, 1) if self.verifications else 0,
+                "rehashed": self.rehashed,
+                "rejected_busy": self.rejected_busy,
+                "timed_out": self.timed_out,
+            }
+
+
+class LoginThrottle:
+    """Per-key failed-login limiter over a sliding window (in-process)"""
+
+    def __init__(self, max_failures=5, window_seconds=300):
+        self.max_failures = max_failures
+        self.window_seconds = window_seconds
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def retry_after(self, key):
+        """Seconds until `key` may try again, or 0 if it is not throttled"""
+        now = time.monotonic()
+        with self._lock:
+            failures = self._failures.get(key)
+            if not failures:
+                return 0
+            while failures and now - failures[0] > self.window_seconds:
+                failures.popleft()
+            if not failures:
+                del self._failures[key]
+                return 0
+            if len(failures) < self.max_failures:
+                return 0
+            return self.window_seconds - (now - failures[0])
+
+    def failed(self, key):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._failures) >= 10000:
+                # Drop keys whose last failure left the window (e.g. sprayed usernames)
+                self._failures = {k: v for k, v in self._failures.items() if now - v[-1] <= self.window_seconds}
+            self._failures.setdefault(key, deque(maxlen=self.max_failures)).append(now)
+
+    def reset(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def tracked(self):
+        with self._lock:
+            return len(self._failures)
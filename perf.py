@@ -0,0 +1,177 @@
+"""Lightweight timing spans with in-process latency histograms.
+
+    from perf import span, timed
+
+    @timed()                      # records under the function name
+    def get_course_data(): ...
+
+    with span("gemini.send_message"):
+        ...
+
+Each operation gets a fixed-bucket histogram (cheap to update, mergeable, and
+the same shape Prometheus uses), from which p50/p95/p99 are estimated.
+`prometheus_text()` renders everything in the text exposition format.
+"""
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in seconds: 0.5 ms .. 60 s, roughly x2 apart
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRIC_NAME = "acadbuddy_operation_duration_seconds"
+
+
+class LatencyHistogram:
+    """Cumulative-bucket histogram of durations in seconds"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def observe(self, seconds, error=False):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        if error:
+            self.errors += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+        return self.max
+
+
+class Timings:
+    """Registry of per-operation histograms shared by the whole process"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, error=False):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds, error)
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except Exception:
+            # Control-flow exits (e.g. Streamlit's rerun) are timed but not counted as errors
+            error = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, error)
+
+    def timed(self, name=None):
+        """Decorator form of span(); defaults to the function's name"""
+        def decorate(fn):
+            label = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(label):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def summary(self):
+        """Per-operation count and p50/p95/p99/max in milliseconds, slowest p95 first"""
+        with self._lock:
+            rows = [
+                {
+                    "operation": name,
+                    "count": h.count,
+                    "errors": h.errors,
+                    "p50_ms": round(h.quantile(0.50) * 1000, 2),
+                    "p95_ms": round(h.quantile(0.95) * 1000, 2),
+                    "p99_ms": round(h.quantile(0.99) * 1000, 2),
+                    "max_ms": round(h.max * 1000, 2),
+                    "total_s": round(h.sum, 3),
+                }
+                for name, h in self._histograms.items()
+            ]
+        return sorted(rows, key=lambda row: row["p95_ms"], reverse=True)
+
+    def prometheus_text(self):
+        """All histograms in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {METRIC_NAME} Duration of instrumented operations.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        errors = []
+        with self._lock:
+            for name in sorted(self._histograms):
+                h = self._histograms[name]
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), h.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    lines.append(f'{METRIC_NAME}_bucket{{operation="{label}",le="{le}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_sum{{operation="{label}"}} {h.sum!r}')
+                lines.append(f'{METRIC_NAME}_count{{operation="{label}"}} {h.count}')
+                errors.append(f'acadbuddy_operation_errors_total{{operation="{label}"}} {h.errors}')
+        lines += ["# HELP acadbuddy_operation_errors_total Instrumented operations that raised.",
+                  "# TYPE acadbuddy_operation_errors_total counter"] + errors
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+def serve_metrics(port, registry=None, host="127.0.0.1"):
+    """Expose GET /metrics for a Prometheus scraper on a background thread.
+
+    Binds to localhost by default: the output names internal operations and
+    has no authentication, so only widen `host` behind a trusted network.
+    """
+    registry = registry or timings
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+    return server
+
+
+timings = Timings()
+span = timings.span
+timed = timings.timed
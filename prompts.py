@@ -0,0 +1,112 @@
+import json
+import math
+import threading
+
+BOT_NAME = "SRM AcadBuddy"
+
+# Prompts over this many (estimated) tokens are logged so they can be trimmed
+PROMPT_TOKEN_BUDGET = 8000
+
+INSTRUCTIONS = f"""You are {BOT_NAME}, a helpful and friendly college bot assistant. You support both new and current students by providing information and handling various student-related services.
+
+You have access to the following data:
+- Course details
+- Student academic information (marks, attendance percentage)
+- Timetable
+- Admission process
+- Complaint submission system (hostel, department, subject, canteen, transport, general)
+
+Key points to remember:
+1. Always be polite, clear, and professional
+2. Provide accurate information based on the data provided
+3. For course-related queries, use the course data
+4. For marks and attendance, respond only if user is authenticated (e.g., roll number is given)
+5. Guide students through complaint submission steps
+6. Handle general queries and greetings naturally
+7. If asked for something not available, politely explain the limitation
+8. Keep responses concise, helpful, and friendly
+9. Use appropriate emojis to keep the chat engaging
+10. Format responses using markdown for better readability
+
+Example interactions:
+- Greet users warmly
+- Help new students with admission process
+- Answer questions about course duration, fees, and subjects
+- Show academic performance (marks, attendance %) after verifying roll number
+- Guide users to file complaints with category selection
+- Display class timetable in a table format
+- Handle small talk naturally
+- Stay focused on student and academic-related queries"""
+
+
+def compact_json(data):
+    """Serialise data without indentation or spaces between separators"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token) used for budget reporting"""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+class CompiledPrompt:
+    """A system instruction built once for one catalog version.
+
+    Only the list of course names goes into the system instruction; the
+    detailed course data relevant to each question is retrieved per turn.
+    """
+
+    def __init__(self, version, instructions, catalog):
+        self.version = version
+        self.instructions = instructions
+        self.catalog = catalog
+        self.text = (
+            f"{instructions}\n\nCourses offered: {catalog}\n"
+            "Relevant course data is supplied with each question under \"Course data\"; "
+            "use it for course facts."
+        )
+        self.parts = {
+            "instructions": estimate_tokens(instructions),
+            "catalog": estimate_tokens(catalog),
+        }
+
+    @property
+    def tokens(self):
+        return sum(self.parts.values())
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def compile_system_prompt(version, courses):
+    """Get the compiled system instruction for a catalog version, building it on first use"""
+    with _compiled_lock:
+        compiled = _compiled.get(version)
+        if compiled is None:
+            compiled = CompiledPrompt(version, INSTRUCTIONS, compact_json(list(courses.keys())))
+            # Only the current version is needed; drop older ones
+            _compiled.clear()
+            _compiled[version] = compiled
+        return compiled
+
+
+def build_turn(user_message, chunks):
+    """Message sent for one turn: the retrieved course data followed by the question"""
+    if not chunks:
+        return user_message
+    context = "\n".join(chunk.text for chunk in chunks)
+    return f"Course data:\n{context}\n\nQuestion: {user_message}"
+
+
+def prompt_sizes(compiled, user_message, history_text="", retrieved_text=""):
+    """Estimated token size of each part of a request, plus the total and budget"""
+    sizes = dict(compiled.parts)
+    sizes["history"] = estimate_tokens(history_text)
+    sizes["retrieved"] = estimate_tokens(retrieved_text)
+    sizes["message"] = estimate_tokens(user_message)
+    sizes["total"] = sum(sizes.values())
+    sizes["budget"] = PROMPT_TOKEN_BUDGET
+    if sizes["total"] > PROMPT_TOKEN_BUDGET:
+        print(f"Prompt over budget: {sizes}")
+    return sizes
@@ -0,0 +1,110 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+# Number of catalog chunks injected into each prompt
+RETRIEVAL_TOP_K = 6
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Small normalisation table so everyday phrasing matches catalog field names
+_SYNONYMS = {
+    "first": "1", "second": "2", "third": "3", "fourth": "4",
+    "fifth": "5", "sixth": "6", "seventh": "7", "eighth": "8",
+    "semester": "sem", "semesters": "sem",
+    "fee": "fees", "cost": "fees", "costs": "fees", "price": "fees", "tuition": "fees",
+    "long": "duration", "years": "duration", "year": "duration",
+    "subject": "subjects", "syllabus": "subjects", "papers": "subjects", "taught": "subjects",
+    "programme": "course", "programmes": "course", "program": "course", "programs": "course",
+    "courses": "course", "departments": "department", "dept": "department",
+}
+
+
+def tokenize(text):
+    """Lower-case word tokens with dotted abbreviations joined (B.Tech -> btech)"""
+    text = re.sub(r"(?<=\w)[.'](?=\w)", "", str(text).lower())
+    return [_SYNONYMS.get(token, token) for token in _TOKEN_RE.findall(text)]
+
+
+class Chunk:
+    """One retrievable piece of the catalog: a path into the course data and its value"""
+
+    def __init__(self, path, value):
+        self.path = path
+        self.value = value
+        if isinstance(value, list):
+            rendered = ", ".join(str(item) for item in value)
+        else:
+            rendered = str(value)
+        self.text = f"{' › '.join(path)}: {rendered}"
+        self.tokens = tokenize(self.text)
+
+
+def chunk_catalog(courses):
+    """Split the catalog into an overview chunk plus one chunk per course field / semester"""
+    chunks = [Chunk(["Courses offered"], list(courses.keys()))]
+
+    def walk(path, value):
+        if isinstance(value, dict) and value:
+            for key, child in value.items():
+                walk(path + [str(key)], child)
+        else:
+            chunks.append(Chunk(path, value))
+
+    for course, details in courses.items():
+        walk([course], details)
+    return chunks
+
+
+class BM25Index:
+    """Okapi BM25 over catalog chunks using an inverted index"""
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # token -> [(chunk index, term frequency)]
+        self.lengths = [len(chunk.tokens) for chunk in chunks]
+        self.avg_length = (sum(self.lengths) / len(chunks)) if chunks else 0
+        for i, chunk in enumerate(chunks):
+            for token, tf in Counter(chunk.tokens).items():
+                self.postings[token].append((i, tf))
+        n = len(chunks)
+        self.idf = {
+            token: math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for token, posting in self.postings.items()
+        }
+
+    def search(self, query, k=RETRIEVAL_TOP_K):
+        """Return up to k (chunk, score) pairs ranked by BM25 score"""
+        scores = defaultdict(float)
+        for token in set(tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for i, tf in self.postings[token]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / self.avg_length)
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.chunks[i], score) for i, score in ranked]
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_index(version, courses):
+    """Get the index for a catalog version, rebuilding it when the version changes"""
+    global _index, _index_version
+    with _index_lock:
+        if _index is None or _index_version != version:
+            _index = BM25Index(chunk_catalog(courses))
+            _index_version = version
+        return _index
+
+
+def retrieve(version, courses, query, k=RETRIEVAL_TOP_K):
+    """Top-k catalog chunks relevant to the query"""
+    return [chunk for chunk, _ in get_index(version, courses).search(query, k)]
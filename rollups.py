@@ -0,0 +1,332 @@
+"""Per-day rollups of chat and user activity.
+
+`daily_stats` holds one document per IST day (_id "YYYY-MM-DD") with message,
+new-user and session counts; `daily_course_stats` holds one document per
+day and course; `activity_sketches` holds a HyperLogLog sketch of the users who
+chatted each day. All but the session counts are kept current as chats and new
+users are written, and can be rebuilt from raw data with:
+
+    python rollups.py backfill [days]
+
+Backfill also computes session counts; afterwards they are recomputed for
+recent days by a scheduled job:
+
+    python rollups.py sessions
+"""
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+import pytz
+from pymongo import UpdateOne
+from hll import HyperLogLog, DEFAULT_PRECISION
+
+IST = pytz.timezone('Asia/Kolkata')
+
+# Furthest back a session still open at the last run can pull the next sessionize window
+MAX_SESSION_LOOKBACK_DAYS = 7
+
+
+def ist_day(timestamp):
+    """IST calendar day of a timestamp; naive values are treated as UTC, as pymongo returns them"""
+    if timestamp.tzinfo is None:
+        timestamp = pytz.utc.localize(timestamp)
+    return timestamp.astimezone(IST).date().isoformat()
+
+
+def wall_clock_ist_day(moment):
+    """IST calendar day of a naive server wall-clock time, as users.created_at is stored"""
+    return moment.astimezone(IST).date().isoformat()
+
+
+def _wall_clock_to_ist():
+    """UTC offset string that turns a stored server wall-clock time into IST, for $dateToString"""
+    local_offset = datetime.now().astimezone().utcoffset()
+    minutes = int((timedelta(hours=5, minutes=30) - local_offset).total_seconds() // 60)
+    sign = '-' if minutes < 0 else '+'
+    return f"{sign}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}"
+
+
+class DailyRollups:
+    """Incremental writer and reader for the daily rollup collections"""
+
+    def __init__(self, db):
+        self.daily = db['daily_stats']
+        self.courses = db['daily_course_stats']
+
+    def record_chats(self, chats):
+        """Fold a batch of written chat documents into the day counters"""
+        messages = Counter()
+        course_counts = Counter()
+        for chat in chats:
+            day = ist_day(chat['timestamp'])
+            messages[day] += 1
+            if chat.get('course_inquiry'):
+                course_counts[(day, chat['course_inquiry'])] += 1
+
+        # Distinct chatters per day live in ActivitySketches
+        operations = [
+            UpdateOne({'_id': day}, {'$inc': {'messages': count}}, upsert=True)
+            for day, count in messages.items()
+        ]
+        if operations:
+            self.daily.bulk_write(operations, ordered=False)
+        if course_counts:
+            self.courses.bulk_write([
+                UpdateOne(
+                    {'_id': f"{day}|{course}"},
+                    {'$set': {'day': day, 'course': course}, '$inc': {'count': count}},
+                    upsert=True
+                )
+                for (day, course), count in course_counts.items()
+            ], ordered=False)
+
+    def record_new_users(self, first_seen_times):
+        """Count newly created users on the IST day they were first seen (naive server wall time, like users.created_at)"""
+        days = Counter(wall_clock_ist_day(first_seen) for first_seen in first_seen_times)
+        if days:
+            self.daily.bulk_write([
+                UpdateOne({'_id': day}, {'$inc': {'new_users': count}}, upsert=True)
+                for day, count in days.items()
+            ], ordered=False)
+
+    def course_totals(self, start_day=None, end_day=None):
+        """Inquiry counts per course, largest first"""
+        match = {}
+        if start_day or end_day:
+            match['day'] = {}
+            if start_day:
+                match['day']['$gte'] = start_day.isoformat()
+            if end_day:
+                match['day']['$lte'] = end_day.isoformat()
+        return list(self.courses.aggregate([
+            {'$match': match},
+            {'$group': {'_id': '$course', 'count': {'$sum': '$count'}}},
+            {'$sort': {'count': -1}}
+        ]))
+
+    def backfill(self, chat_collection, user_collection, days=None):
+        """Recompute rollups from raw chat_history and users, entirely server-side with $merge"""
+        chat_match, user_match = {}, {}
+        if days:
+            # Start on a day boundary so the first day's counts are complete
+            first_day = (datetime.now(IST) - timedelta(days=days)).date()
+            since = IST.localize(datetime.combine(first_day, datetime.min.time()))
+            chat_match = {'timestamp': {'$gte': since}}
+            user_match = {'created_at': {'$gte': since.astimezone().replace(tzinfo=None)}}
+        ist_date = {'$dateToString': {'format': '%Y-%m-%d', 'date': '$timestamp', 'timezone': 'Asia/Kolkata'}}
+        merge = {'on': '_id', 'whenMatched': 'merge', 'whenNotMatched': 'insert'}
+
+        chat_collection.aggregate([
+            {'$match': chat_match},
+            {'$group': {'_id': ist_date, 'messages': {'$sum': 1}}},
+            {'$merge': dict(merge, into=self.daily.name)}
+        ])
+        chat_collection.aggregate([
+            {'$match': dict(chat_match, course_inquiry={'$ne': None})},
+            {'$group': {'_id': {'day': ist_date, 'course': '$course_inquiry'}, 'count': {'$sum': 1}}},
+            {'$project': {'_id': {'$concat': ['$_id.day', '|', '$_id.course']}, 'day': '$_id.day', 'course': '$_id.course', 'count': 1}},
+            {'$merge': dict(merge, into=self.courses.name, whenMatched='replace')}
+        ])
+        # users.created_at is stored as naive server wall time, so it is shifted by the server's offset from IST
+        user_collection.aggregate([
+            {'$match': user_match},
+            {'$group': {
+                '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at', 'timezone': _wall_clock_to_ist()}},
+                'new_users': {'$sum': 1}
+            }},
+            {'$merge': dict(merge, into=self.daily.name)}
+        ])
+
+
+def _earliest_open_session_day(daily_collection, oldest_day):
+    """IST day of the oldest session that was still open when sessionize last ran, from `oldest_day` on"""
+    doc = daily_collection.find_one(
+        {'_id': {'$gte': oldest_day.isoformat()}, 'open_since': {'$ne': None}},
+        {'open_since': 1},
+        sort=[('open_since', 1)]
+    )
+    return datetime.strptime(ist_day(doc['open_since']), '%Y-%m-%d').date() if doc else None
+
+
+def sessionize(chat_collection, daily_collection, days=2, gap_minutes=30, now=None):
+    """Split each user's chats into sessions at inactivity gaps and materialise per-day session stats.
+
+    Runs entirely in MongoDB (needs 5.0+ for $setWindowFields) from the rollup job,
+    never from a page request. Sessions are attributed to the IST day they start
+    on. Each day also records `open_since`, the start of its earliest session that
+    was still open at this run; the next run widens its window back to that day, so
+    a long session is recomputed whole once it closes instead of being cut at the
+    window start. Days before the window are left untouched. Returns the first
+    day recomputed (None for all history).
+    """
+    gap_ms = int(gap_minutes * 60 * 1000)
+    now = now or datetime.now(IST)
+    match = {'user_id': {'$ne': None}}
+    first_day = None
+    if days:
+        first_day = (now - timedelta(days=days)).date()
+        open_day = _earliest_open_session_day(daily_collection, (now - timedelta(days=MAX_SESSION_LOOKBACK_DAYS)).date())
+        if open_day and open_day < first_day:
+            first_day = open_day
+        since = IST.localize(datetime.combine(first_day, datetime.min.time()))
+        # Sessions open at the last run started on or after `since`, so looking back
+        # one gap is enough to tell which early chats continue an older, closed session
+        match['timestamp'] = {'$gte': since - timedelta(milliseconds=gap_ms)}
+    open_after = now - timedelta(milliseconds=gap_ms)
+
+    pipeline = [
+        {'$match': match},
+        {'$setWindowFields': {
+            'partitionBy': '$user_id',
+            'sortBy': {'timestamp': 1},
+            'output': {'previous': {'$shift': {'output': '$timestamp', 'by': -1}}}
+        }},
+        {'$set': {'starts_session': {'$cond': [
+            {'$or': [
+                {'$eq': [{'$ifNull': ['$previous', None]}, None]},
+                {'$gt': [{'$subtract': ['$timestamp', '$previous']}, gap_ms]}
+            ]}, 1, 0
+        ]}}},
+        {'$setWindowFields': {
+            'partitionBy': '$user_id',
+            'sortBy': {'timestamp': 1},
+            'output': {'session': {'$sum': '$starts_session', 'window': {'documents': ['unbounded', 'current']}}}
+        }},
+        {'$group': {
+            '_id': {'user_id': '$user_id', 'session': '$session'},
+            'start': {'$min': '$timestamp'},
+            'end': {'$max': '$timestamp'},
+            'messages': {'$sum': 1}
+        }},
+        {'$group': {
+            '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$start', 'timezone': 'Asia/Kolkata'}},
+            'sessions': {'$sum': 1},
+            'session_ms': {'$sum': {'$subtract': ['$end', '$start']}},
+            'session_messages': {'$sum': '$messages'},
+            'open_since': {'$min': {'$cond': [{'$gte': ['$end', open_after]}, '$start', None]}}
+        }},
+    ]
+    if first_day:
+        pipeline.append({'$match': {'_id': {'$gte': first_day.isoformat()}}})
+    pipeline += [
+        {'$project': {
+            'sessions': 1,
+            'session_minutes': {'$divide': ['$session_ms', 60000]},
+            'avg_session_minutes': {'$divide': [{'$divide': ['$session_ms', 60000]}, '$sessions']},
+            'session_messages': 1,
+            'messages_per_session': {'$divide': ['$session_messages', '$sessions']},
+            'open_since': {'$ifNull': ['$open_since', None]},
+            'sessions_updated_at': {'$literal': now}
+        }},
+        {'$merge': {'into': daily_collection.name, 'on': '_id', 'whenMatched': 'merge', 'whenNotMatched': 'insert'}}
+    ]
+    chat_collection.aggregate(pipeline, allowDiskUse=True)
+    return first_day
+
+
+class ActivitySketches:
+    """Per-day HyperLogLog sketches of active users, stored in `activity_sketches`.
+
+    A user is active on the IST days they chatted. The live hook and backfill both
+    read that from chat documents, so a rebuilt sketch matches the live one. Each
+    batch is folded in with $max on the touched registers, so writers in different
+    processes merge safely. Weekly and monthly uniques are the
+    union of the day sketches in the window, at a fixed cost per day.
+    """
+
+    def __init__(self, db, p=DEFAULT_PRECISION):
+        self.collection = db['activity_sketches']
+        self.p = p
+
+    def record(self, events):
+        """Fold (IST day, user_id) activity events into the day sketches"""
+        by_day = {}
+        for day, user_id in events:
+            by_day.setdefault(day, HyperLogLog(self.p)).add(user_id)
+        operations = [
+            UpdateOne(
+                {'_id': day},
+                {'$max': {f"r.{index}": rank for index, rank in sketch.to_sparse().items()},
+                 '$setOnInsert': {'p': self.p}},
+                upsert=True
+            )
+            for day, sketch in by_day.items()
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def record_chats(self, chats):
+        """Hook for the chat writer: fold a batch of written chat documents into the day sketches"""
+        self.record({(ist_day(chat['timestamp']), chat['user_id']) for chat in chats if chat.get('user_id')})
+
+    def load(self, start_day, end_day):
+        """Day sketches for an inclusive range of IST days in one query, keyed by ISO day.
+
+        Pass the result as `loaded` to answer several ranges inside it without re-reading.
+        """
+        return {
+            doc['_id']: HyperLogLog.from_sparse(doc.get('r'), doc.get('p', self.p))
+            for doc in self.collection.find({'_id': {'$gte': start_day.isoformat(), '$lte': end_day.isoformat()}})
+        }
+
+    def unique(self, start_day, end_day, loaded=None):
+        """Approximate distinct active users over an inclusive range of IST days"""
+        sketches = self.load(start_day, end_day) if loaded is None else loaded
+        union = HyperLogLog(self.p)
+        for day, sketch in sketches.items():
+            if start_day.isoformat() <= day <= end_day.isoformat():
+                union.merge(sketch)
+        return union.count()
+
+    def daily(self, start_day, end_day, loaded=None):
+        """Approximate active users for each day in the range, oldest first"""
+        sketches = self.load(start_day, end_day) if loaded is None else loaded
+        days = []
+        day = start_day
+        while day <= end_day:
+            sketch = sketches.get(day.isoformat())
+            days.append({'date': day.isoformat(), 'count': sketch.count() if sketch else 0})
+            day += timedelta(days=1)
+        return days
+
+    def backfill(self, chat_collection, days=None):
+        """Rebuild day sketches from who chatted on each day"""
+        match = {'user_id': {'$ne': None}}
+        if days:
+            first_day = (datetime.now(IST) - timedelta(days=days)).date()
+            match['timestamp'] = {'$gte': IST.localize(datetime.combine(first_day, datetime.min.time()))}
+        cursor = chat_collection.aggregate([
+            {'$match': match},
+            {'$group': {'_id': {
+                'day': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$timestamp', 'timezone': 'Asia/Kolkata'}},
+                'user_id': '$user_id'
+            }}}
+        ], allowDiskUse=True)
+        self.record((doc['_id']['day'], doc['_id']['user_id']) for doc in cursor)
+
+
+def main(argv):
+    from pymongo import MongoClient
+    from config import get_setting
+
+    if len(argv) < 2 or argv[1] not in ("backfill", "sessions"):
+        print(__doc__)
+        return 2
+    db = MongoClient(get_setting("MONGO_URI"))['university_chatbot']
+    rollups = DailyRollups(db)
+    gap_minutes = float(get_setting("SESSION_GAP_MINUTES", 30))
+    if argv[1] == "sessions":
+        first_day = sessionize(db['chat_history'], rollups.daily, days=2, gap_minutes=gap_minutes)
+        print(f"Recomputed session stats from {first_day}")
+        return 0
+    days = int(argv[2]) if len(argv) > 2 else None
+    rollups.backfill(db['chat_history'], db['users'], days=days)
+    ActivitySketches(db).backfill(db['chat_history'], days=days)
+    # Session stats too, so a fresh deploy has them before the scheduled `sessions` job first runs
+    sessionize(db['chat_history'], rollups.daily, days=days, gap_minutes=gap_minutes)
+    print(f"Backfilled {rollups.daily.count_documents({})} days of rollups, including session stats")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,342 @@
+"""Synthetic data for local testing of the chat, analytics and complaint pages.
+
+    python seed.py --users 20000 --chats 1000000 --issues 50000 --days 180
+    python seed.py --departments 3 --courses-per-department 8 --chats 0
+    python seed.py --issues 5000 --legacy-issues   # also fill the pre-migration collections
+
+Everything is written with unordered insert_many batches, and the daily
+rollups and activity sketches are fed through the same hooks the live
+writers use. Output is deterministic for a given --seed. Use --drop to
+empty the target collections first. Never run this against production.
+"""
+import argparse
+import random
+import struct
+import sys
+import uuid
+from datetime import datetime, timedelta
+import pytz
+from bson import ObjectId
+from issues import (
+    ISSUE_TYPES, HOSTELS, FLOORS, GENERAL_CATEGORIES, CATEGORIES, TYPE_FIELDS,
+    COMMON_FIELDS, build_issue
+)
+from rollups import DailyRollups, ActivitySketches
+
+IST = pytz.timezone('Asia/Kolkata')
+BATCH_SIZE = 5000
+
+# degree -> (department, duration in years, fee range per semester in INR)
+DEGREES = {
+    "B.Tech": ("Engineering", 4, (55000, 95000)),
+    "M.Tech": ("Engineering", 2, (60000, 110000)),
+    "B.Sc": ("Science", 3, (30000, 55000)),
+    "M.Sc": ("Science", 2, (35000, 65000)),
+    "BCA": ("Computer Applications", 3, (40000, 60000)),
+    "MCA": ("Computer Applications", 2, (50000, 80000)),
+    "BBA": ("Management", 3, (45000, 70000)),
+    "MBA": ("Management", 2, (90000, 160000)),
+    "B.Com": ("Commerce", 3, (30000, 50000)),
+    "BA": ("Arts and Humanities", 3, (20000, 40000)),
+    "B.Pharm": ("Pharmacy", 4, (60000, 90000)),
+    "LLB": ("Law", 3, (50000, 85000)),
+}
+SPECIALISATIONS = {
+    "Engineering": ["Computer Science", "Electronics and Communication", "Mechanical", "Civil",
+                    "Electrical and Electronics", "Biotechnology", "Aerospace", "Chemical",
+                    "Information Technology", "Data Science"],
+    "Science": ["Physics", "Chemistry", "Mathematics", "Biotechnology", "Microbiology",
+                "Computer Science", "Statistics", "Environmental Science"],
+    "Computer Applications": ["Cloud Computing", "Cyber Security", "Data Analytics", "Software Development"],
+    "Management": ["Finance", "Marketing", "Human Resources", "Business Analytics", "Operations"],
+    "Commerce": ["Accounting and Finance", "Banking", "Taxation", "Corporate Secretaryship"],
+    "Arts and Humanities": ["English", "Economics", "Psychology", "Journalism", "History"],
+    "Pharmacy": ["Pharmaceutics", "Pharmacology", "Pharmaceutical Chemistry"],
+    "Law": ["Corporate Law", "Criminal Law", "Intellectual Property"],
+}
+SUBJECT_STEMS = [
+    "Mathematics", "Programming", "Data Structures", "Statistics", "Communication Skills",
+    "Economics", "Ethics", "Research Methods", "Project Work", "Laboratory", "Design",
+    "Systems", "Analysis", "Management", "Theory", "Applications", "Seminar",
+]
+FIRST_NAMES = ["Aarav", "Priya", "Karthik", "Divya", "Rahul", "Sneha", "Arjun", "Meera",
+               "Vikram", "Ananya", "Surya", "Lakshmi", "Rohan", "Kavya", "Aditya", "Nila"]
+LAST_NAMES = ["Kumar", "Sharma", "Iyer", "Reddy", "Nair", "Menon", "Patel", "Rao",
+              "Singh", "Das", "Pillai", "Krishnan"]
+DETAILS = {
+    "Plumbing": ["Tap leaking in the washroom", "No water supply since morning", "Drain blocked"],
+    "Electrical": ["Fan not working", "Tube light flickering", "Power socket sparking"],
+    "Civil": ["Wall seepage near the window", "Broken door hinge", "Cracked floor tiles"],
+    "HR": ["Warden not reachable at night", "Room change request pending"],
+    "Food": ["Food served cold at dinner", "Mess timings not followed"],
+    "Curriculum": ["Syllabus not covered before the internal exam", "Elective list not published"],
+    "Faculty": ["Lab sessions cancelled repeatedly", "Faculty not available for doubts"],
+    "Classroom Management": ["Projector not working", "Classroom overcrowded"],
+    "Fee": ["Fee receipt not generated", "Scholarship not adjusted in fee"],
+    "Placement": ["Placement drive details not shared", "Resume review pending"],
+    "General": ["Bus arrives late every morning", "Sports equipment not issued", "Canteen overpriced"],
+}
+QUESTIONS = [
+    "What is the fee structure for {course}?",
+    "How long is the {course} program?",
+    "How many semesters does {course} have?",
+    "What subjects are taught in {course} sem {sem}?",
+    "Tell me about admission process for {course}",
+    "Who are the staff handling {course}?",
+    "What are the career options after {course}?",
+]
+GENERAL_QUESTIONS = [
+    "Hi! Can you help me with course information?",
+    "What courses do you offer?",
+    "Tell me what are the departments available?",
+    "Is hostel accommodation available?",
+]
+# Relative chat volume by IST hour: quiet overnight, peaks late morning and evening
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 3, 5, 8, 10, 12, 12, 11, 9, 9, 10, 11, 12, 13, 14, 13, 10, 6, 3]
+
+
+def generate_catalog(rng, departments=None, courses_per_department=6):
+    """A multi-department course catalog in the `course_data.courses` shape.
+
+    The plain degree names (B.Tech, B.Sc, BCA, ...) are always included for
+    each department, so the fast path and example questions keep working.
+    """
+    names = list(SPECIALISATIONS)[:departments] if departments else list(SPECIALISATIONS)
+    courses = {}
+    for degree, (department, years, fee_range) in DEGREES.items():
+        if department not in names:
+            continue
+        options = [None] + rng.sample(SPECIALISATIONS[department], min(courses_per_department - 1, len(SPECIALISATIONS[department])))
+        for specialisation in options:
+            name = f"{degree} {specialisation}" if specialisation else degree
+            semesters = years * 2
+            stems = rng.sample(SUBJECT_STEMS, 6)
+            courses[name] = {
+                "department": department,
+                "duration": f"{years} years",
+                "fees": f"{rng.randrange(*fee_range, 5000):,} INR per semester",
+                "semesters": semesters,
+                "subjects": {
+                    f"Sem {sem}": [f"{specialisation or department} {stem} {sem}" for stem in stems[:rng.randint(4, 6)]]
+                    for sem in range(1, semesters + 1)
+                },
+                "staff": [f"Dr. {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(rng.randint(3, 8))],
+            }
+    return courses
+
+
+def generate_users(rng, count, days, now):
+    """User documents as the activity tracker writes them (naive local times)"""
+    local_now = now.astimezone().replace(tzinfo=None)
+    for _ in range(count):
+        created_at = local_now - timedelta(days=rng.random() * days)
+        last_active = min(local_now, created_at + timedelta(days=rng.expovariate(1 / 10)))
+        yield {
+            "user_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "created_at": created_at,
+            "last_active": last_active,
+            # Most visitors come once; a long tail returns often
+            "access_count": int(rng.paretovariate(1.2)) if rng.random() < 0.6 else 1,
+        }
+
+
+def _weights(n, exponent):
+    """Cumulative Zipf weights for n items, most popular first"""
+    total, cumulative = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def generate_chats(rng, count, user_ids, courses, days, now, course_skew=1.1):
+    """Chat documents in realistic sessions.
+
+    A few heavy users and popular courses dominate (Zipf), traffic follows the
+    IST day, and each session is a burst of messages minutes apart.
+    """
+    if not user_ids:
+        return
+    course_names = list(courses)
+    rng.shuffle(course_names)
+    course_weights = _weights(len(course_names), course_skew)
+    user_weights = _weights(len(user_ids), 0.8)
+    hours = list(range(24))
+    produced = 0
+    while produced < count:
+        user_id = rng.choices(user_ids, cum_weights=user_weights)[0]
+        day = (now - timedelta(days=rng.randrange(days))).date()
+        moment = IST.localize(datetime.combine(day, datetime.min.time())) + timedelta(
+            hours=rng.choices(hours, HOUR_WEIGHTS)[0], minutes=rng.random() * 60
+        )
+        for _ in range(min(count - produced, rng.choice([1, 1, 2, 2, 3, 4, 6, 8]))):
+            if moment > now:
+                break
+            course = rng.choices(course_names, cum_weights=course_weights)[0] if rng.random() < 0.75 else None
+            if course:
+                semesters = courses[course].get("semesters", 1)
+                question = rng.choice(QUESTIONS).format(course=course, sem=rng.randint(1, semesters))
+            else:
+                question = rng.choice(GENERAL_QUESTIONS)
+            fast_path = course is not None and rng.random() < 0.25
+            from_cache = not fast_path and rng.random() < 0.15
+            chat = {
+                "timestamp": moment,
+                "user_id": user_id,
+                "user_message": question,
+                "bot_response": f"Here is what I found about {course or 'our courses'}.",
+                "course_inquiry": course,
+                "from_cache": from_cache,
+                "fast_path": fast_path,
+            }
+            if not (fast_path or from_cache):
+                ttft = rng.lognormvariate(6.2, 0.4)
+                chat.update({"ttft_ms": round(ttft, 1), "total_ms": round(ttft + rng.lognormvariate(7, 0.5), 1), "streamed": True})
+            yield chat
+            produced += 1
+            moment += timedelta(minutes=rng.expovariate(1 / 3))
+
+
+def generate_issues(rng, count, days, now):
+    """Valid issue documents (built with the form's schema) with age-dependent status"""
+    for _ in range(count):
+        issue_type = rng.choices(ISSUE_TYPES, [5, 3, 2])[0]
+        category = rng.choice(CATEGORIES[issue_type]) if issue_type in CATEGORIES else None
+        data = {
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "reg_no": f"RA{rng.randint(21, 25)}{rng.randrange(10 ** 11):011d}",
+            "type": issue_type,
+            "category": category,
+            "details": rng.choice(DETAILS[category or "General"]),
+            "hostel": rng.choice(HOSTELS),
+            "floor": rng.choice(FLOORS),
+            "room_no": str(rng.randint(1, 4) * 100 + rng.randint(1, 40)),
+            "department": rng.choice(list(SPECIALISATIONS)),
+            "general_category": rng.choice(GENERAL_CATEGORIES),
+        }
+        created_at = now - timedelta(days=rng.random() * days)
+        issue = build_issue(data, now=created_at)
+        age_days = (now - created_at).days
+        resolved_odds = min(0.9, age_days / 30)
+        roll = rng.random()
+        if roll < resolved_odds:
+            issue["status"] = "Resolved"
+        elif roll < resolved_odds + 0.3:
+            issue["status"] = "In Progress"
+        if issue["status"] != "Pending":
+            issue["updated_at"] = min(now, created_at + timedelta(days=rng.expovariate(1 / 3)))
+        yield issue
+
+
+def legacy_documents(rng, issue):
+    """The pre-migration copies of an issue: one in admin_issues and one in its type collection, sharing an _id"""
+    fields = COMMON_FIELDS + TYPE_FIELDS[issue["type"]]
+    # Old documents carried their creation time only in the ObjectId
+    document = {
+        "_id": ObjectId(struct.pack(">I", int(issue["created_at"].timestamp())) + rng.randbytes(8)),
+        **{field: issue.get(field) for field in fields}
+    }
+    target = {"Hostel": "hostel_issues", "Department": "dept_issues", "General": "general_issues"}[issue["type"]]
+    for name in ("admin_issues", target):
+        yield name, dict(document)
+
+
+def insert_batches(collection, documents, batch_size=BATCH_SIZE, on_batch=None):
+    """insert_many in unordered batches; returns how many documents were written"""
+    written, batch = 0, []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            if on_batch:
+                on_batch(batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        if on_batch:
+            on_batch(batch)
+        written += len(batch)
+    return written
+
+
+def seed(db, issues_db, users=1000, chats=10000, issues=500, days=90, departments=None,
+         courses_per_department=6, legacy_issues=False, drop=False, random_seed=42, batch_size=BATCH_SIZE, log=print):
+    rng = random.Random(random_seed)
+    now = datetime.now(IST)
+    rollups = DailyRollups(db)
+    sketches = ActivitySketches(db)
+
+    if drop:
+        for name in ("users", "chat_history", "daily_stats", "daily_course_stats", "activity_sketches"):
+            db[name].delete_many({})
+        for name in ["issues"] + (["admin_issues", "hostel_issues", "dept_issues", "general_issues"] if legacy_issues else []):
+            issues_db[name].delete_many({})
+
+    courses = generate_catalog(rng, departments, courses_per_department)
+    db["course_data"].update_one(
+        {},
+        {"$set": {"courses": courses, "updated_at": datetime.now()}, "$inc": {"version": 1}},
+        upsert=True
+    )
+    log(f"course_data: {len(courses)} courses")
+
+    user_docs = list(generate_users(rng, users, days, now))
+    insert_batches(db["users"], user_docs, batch_size,
+                   on_batch=lambda batch: rollups.record_new_users(doc["created_at"] for doc in batch))
+    log(f"users: {len(user_docs)}")
+
+    def chat_hooks(batch):
+        rollups.record_chats(batch)
+        sketches.record_chats(batch)
+
+    written = insert_batches(db["chat_history"], generate_chats(rng, chats, [doc["user_id"] for doc in user_docs], courses, days, now),
+                             batch_size, on_batch=chat_hooks)
+    log(f"chat_history: {written}")
+
+    def legacy_hook(batch):
+        by_collection = {}
+        for issue in batch:
+            for name, document in legacy_documents(rng, issue):
+                by_collection.setdefault(name, []).append(document)
+        for name, documents in by_collection.items():
+            issues_db[name].insert_many(documents, ordered=False)
+
+    written = insert_batches(issues_db["issues"], generate_issues(rng, issues, days, now), batch_size,
+                             on_batch=legacy_hook if legacy_issues else None)
+    log(f"issues: {written}" + (" (also in the legacy collections)" if legacy_issues else ""))
+
+
+def main(argv):
+    from pymongo import MongoClient
+    from config import get_setting
+    from indexes import CHAT_DB, ISSUES_DB, ensure_indexes
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--chats", type=int, default=10000)
+    parser.add_argument("--issues", type=int, default=500)
+    parser.add_argument("--days", type=int, default=90, help="spread data over this many past days")
+    parser.add_argument("--departments", type=int, default=None, help="limit the catalog to this many departments")
+    parser.add_argument("--courses-per-department", type=int, default=6)
+    parser.add_argument("--legacy-issues", action="store_true", help="also write the pre-migration issue collections")
+    parser.add_argument("--drop", action="store_true", help="empty the seeded collections first")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--uri", default=None, help="MongoDB URI (defaults to MONGO_URI)")
+    args = parser.parse_args(argv[1:])
+
+    client = MongoClient(args.uri or get_setting("MONGO_URI"))
+    ensure_indexes(client)
+    seed(
+        client[CHAT_DB], client[ISSUES_DB],
+        users=args.users, chats=args.chats, issues=args.issues, days=args.days,
+        departments=args.departments, courses_per_department=args.courses_per_department,
+        legacy_issues=args.legacy_issues, drop=args.drop, random_seed=args.seed, batch_size=args.batch_size
+    )
+    print("Done. Session stats for older days: python rollups.py backfill")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
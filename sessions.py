@@ -0,0 +1,216 @@
+"""Signed, stateless admin sessions with a revocation list.
+
+Force every session of an admin to sign out (takes effect within a minute):
+
+    python sessions.py revoke <username>
+"""
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class AdminSessions:
+    """Stateless admin sessions: HMAC-signed tokens that carry their own expiry.
+
+    Verifying a token is pure CPU work. A token older than `refresh_seconds` is
+    re-signed with a fresh expiry (the sliding window), and only then is
+    `last_login` written back, so an active admin costs one write every few
+    minutes rather than two round-trips per rerun.
+
+    Logout and forced sign-out go through a small revocation list: revoked
+    session ids and per-user "not before" times are kept in an in-process set
+    and in `revoked_collection` (expired by a TTL index). Other processes pick
+    them up within `sync_seconds`.
+    """
+
+    def __init__(self, revoked_collection, admin_collection, secret=None, ttl_seconds=86400, refresh_seconds=300, sync_seconds=30):
+        if not secret:
+            print("ADMIN_SESSION_SECRET is not set; admin sessions will not survive a restart")
+            secret = secrets.token_hex(32)
+        self.revoked = revoked_collection
+        self.admins = admin_collection
+        self.secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+        self.ttl_seconds = ttl_seconds
+        self.refresh_seconds = refresh_seconds
+        self.sync_seconds = sync_seconds
+        self._lock = threading.Lock()
+        # Revocations are kept until no token they cover can still be alive
+        self.retention_seconds = ttl_seconds + sync_seconds
+        self._revoked_sessions = {}  # session id -> epoch after which it can be forgotten
+        self._not_before = {}  # username -> epoch; sessions authenticated earlier are invalid
+        self._synced_at = 0.0
+        self.verified = 0
+        self.rejected = 0
+        self.refreshed = 0
+
+    def _sign(self, body):
+        return _b64encode(hmac.new(self.secret, body.encode("ascii"), hashlib.sha256).digest())
+
+    def _encode(self, username, session_id, now, auth_time=None):
+        # `auth` is when the password was checked; it survives sliding refreshes, unlike `iat`
+        claims = {"u": username, "sid": session_id, "auth": round(auth_time or now, 3),
+                  "iat": round(now, 3), "exp": int(now + self.ttl_seconds)}
+        body = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        return f"{body}.{self._sign(body)}"
+
+    def _decode(self, token):
+        try:
+            body, signature = token.split(".", 1)
+            if not hmac.compare_digest(signature, self._sign(body)):
+                return None
+            return json.loads(_b64decode(body))
+        except Exception:
+            return None
+
+    def issue(self, username):
+        """Sign a new session token for a freshly authenticated admin"""
+        now = time.time()
+        try:
+            self.admins.update_one({"username": username}, {"$set": {"last_login": datetime.now()}})
+        except Exception as e:
+            print(f"Error recording admin login: {str(e)}")
+        return self._encode(username, secrets.token_hex(16), now)
+
+    def verify(self, token):
+        """Return the token to keep using (re-signed when due), or None if it is not valid"""
+        claims = self._decode(token) if token else None
+        now = time.time()
+        if not claims or claims.get("exp", 0) <= now or self._is_revoked(claims, now):
+            with self._lock:
+                self.rejected += 1
+            return None
+        with self._lock:
+            self.verified += 1
+        if now - claims["iat"] < self.refresh_seconds:
+            return token
+        # Never extend a session on a stale revocation list
+        if self._is_revoked(claims, now, force_sync=True):
+            with self._lock:
+                self.verified -= 1
+                self.rejected += 1
+            return None
+        # Slide the window; this is the only time a valid session touches the database
+        try:
+            self.admins.update_one({"username": claims["u"]}, {"$set": {"last_login": datetime.now()}})
+        except Exception as e:
+            print(f"Error refreshing admin session: {str(e)}")
+        with self._lock:
+            self.refreshed += 1
+        return self._encode(claims["u"], claims["sid"], now, claims.get("auth", claims["iat"]))
+
+    def _is_revoked(self, claims, now, force_sync=False):
+        self._sync(now, force_sync)
+        with self._lock:
+            if claims["sid"] in self._revoked_sessions:
+                return True
+            return claims.get("auth", claims["iat"]) < self._not_before.get(claims["u"], 0)
+
+    def _sync(self, now, force=False):
+        """Reload the revocation list from MongoDB (at most once every sync_seconds unless forced)"""
+        with self._lock:
+            if not force and now - self._synced_at < self.sync_seconds:
+                return
+            self._synced_at = now
+        try:
+            sessions, not_before = {}, {}
+            for entry in self.revoked.find({}, {"session_id": 1, "username": 1, "not_before": 1, "forget_after": 1}):
+                if entry.get("session_id"):
+                    sessions[entry["session_id"]] = entry.get("forget_after", now + self.retention_seconds)
+                elif entry.get("username"):
+                    not_before[entry["username"]] = entry.get("not_before", 0)
+        except Exception as e:
+            print(f"Error loading revoked admin sessions: {str(e)}")
+            return
+        with self._lock:
+            for session_id, forget_after in sessions.items():
+                self._revoked_sessions[session_id] = max(self._revoked_sessions.get(session_id, 0), forget_after)
+            for username, cutoff in not_before.items():
+                self._not_before[username] = max(self._not_before.get(username, 0), cutoff)
+            # Forget revocations once every token they cover has expired
+            self._revoked_sessions = {sid: until for sid, until in self._revoked_sessions.items() if until > now}
+            self._not_before = {user: cutoff for user, cutoff in self._not_before.items()
+                                if cutoff + self.retention_seconds > now}
+
+    def revoke(self, token):
+        """Log out one session"""
+        claims = self._decode(token) if token else None
+        if not claims:
+            return False
+        # A revoked session is never re-signed after the next sync, so no token for it
+        # outlives now + ttl + sync_seconds
+        forget_after = time.time() + self.retention_seconds
+        with self._lock:
+            self._revoked_sessions[claims["sid"]] = forget_after
+        try:
+            self.revoked.update_one(
+                {"_id": f"sid:{claims['sid']}"},
+                {"$set": {"session_id": claims["sid"], "username": claims["u"], "forget_after": forget_after,
+                          "expires_at": datetime.now() + timedelta(seconds=self.retention_seconds)}},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"Error revoking admin session: {str(e)}")
+        return True
+
+    def revoke_user(self, username):
+        """Force sign-out: invalidate every session issued to `username` so far"""
+        now = time.time()
+        with self._lock:
+            self._not_before[username] = now
+        try:
+            self.revoked.update_one(
+                {"_id": f"user:{username}"},
+                {"$set": {"username": username, "not_before": now,
+                          "expires_at": datetime.now() + timedelta(seconds=self.retention_seconds)}},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"Error revoking admin sessions for {username}: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "verified": self.verified,
+                "rejected": self.rejected,
+                "refreshed": self.refreshed,
+                "revoked_sessions": len(self._revoked_sessions),
+                "signed_out_users": len(self._not_before),
+                "ttl_seconds": self.ttl_seconds,
+                "refresh_seconds": self.refresh_seconds,
+            }
+
+
+def main(argv):
+    from pymongo import MongoClient
+    from config import get_setting
+
+    if len(argv) < 3 or argv[1] != "revoke":
+        print(__doc__)
+        return 2
+    db = MongoClient(get_setting("MONGO_URI"))["university_chatbot"]
+    sessions = AdminSessions(
+        db["revoked_sessions"], db["admins"],
+        secret=get_setting("ADMIN_SESSION_SECRET") or "unused",
+        ttl_seconds=int(get_setting("ADMIN_SESSION_TTL_SECONDS", 86400))
+    )
+    sessions.revoke_user(argv[2])
+    print(f"Signed out every session of {argv[2]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,52 @@
+"""Shared test setup: mongomock in place of MongoDB and a stubbed Gemini model.
+
+database.py creates its client and background workers on import, so the
+stand-ins are installed here, before any test module imports it.
+"""
+import os
+import sys
+import mongomock
+import pymongo
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("ADMIN_SESSION_SECRET", "test-secret")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+pymongo.MongoClient = mongomock.MongoClient
+
+ANSWER = "Admissions open in May. Apply online through the admission portal."
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubChat:
+    def __init__(self, history):
+        self.history = list(history or [])
+
+    def send_message(self, message, stream=False):
+        if stream:
+            words = ANSWER.split(" ")
+            return iter(StubResponse(" ".join(words[i:i + 4]) + " ") for i in range(0, len(words), 4))
+        return StubResponse(ANSWER)
+
+
+class StubModel:
+    def __init__(self, model_name=None, system_instruction=None):
+        self.system_instruction = system_instruction
+
+    def start_chat(self, history=None):
+        return StubChat(history)
+
+
+@pytest.fixture
+def stub_gemini(monkeypatch):
+    import google.generativeai as genai
+    monkeypatch.setattr(genai, "configure", lambda **kwargs: None)
+    monkeypatch.setattr(genai, "GenerativeModel", StubModel)
+    return ANSWER
@@ -0,0 +1,42 @@
+from datetime import datetime
+from pymongo.errors import BulkWriteError
+from activity import ActivityTracker
+
+
+class PartlyFailingCollection:
+    """Applies every upsert except those for `failing_users`, like an unordered bulk_write"""
+
+    def __init__(self, failing_users):
+        self.failing_users = failing_users
+        self.access_counts = {}
+
+    def bulk_write(self, operations, ordered=True):
+        errors, upserted = [], []
+        for index, operation in enumerate(operations):
+            user_id = operation._filter['user_id']
+            if user_id in self.failing_users:
+                errors.append({'index': index, 'code': 91, 'errmsg': 'shutdown in progress'})
+                continue
+            if user_id not in self.access_counts:
+                upserted.append({'index': index, '_id': user_id})
+            self.access_counts[user_id] = self.access_counts.get(user_id, 0) + operation._doc['$inc']['access_count']
+        raise BulkWriteError({'writeErrors': errors, 'upserted': upserted, 'nUpserted': len(upserted)})
+
+
+def test_partial_failure_requeues_only_failed_users():
+    collection = PartlyFailingCollection(failing_users={'b'})
+    new_users = []
+    tracker = ActivityTracker(collection, heartbeat_seconds=3600, on_new_users=new_users.extend)
+    now = datetime(2025, 3, 1, 10, 0)
+    for user_id in ('a', 'b', 'a'):
+        tracker.touch(user_id, now)
+
+    assert tracker.flush() == 1
+    assert collection.access_counts == {'a': 2}
+    assert new_users == [now]
+    assert tracker.stats()['pending_users'] == 1
+
+    collection.failing_users = set()
+    tracker.close()
+    assert collection.access_counts == {'a': 2, 'b': 1}
+    assert new_users == [now, now]
@@ -0,0 +1,90 @@
+import os
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_get_ai_response_answers_through_gemini(stub_gemini, monkeypatch):
+    # The sidebar logo is a local Windows path; it is not what this test is about
+    monkeypatch.setattr(st, "image", lambda *args, **kwargs: None)
+    from cache import answer_cache
+    from perf import timings
+    answer_cache.clear()
+
+    at = AppTest.from_file(f"{ROOT}/app.py", default_timeout=30)
+    at.secrets["GOOGLE_API_KEY"] = "test-key"
+    at.run()
+    assert not at.exception
+
+    at.text_input(key="input").input("Tell me about admission process")
+    next(button for button in at.button if button.label == "Send 📤").click()
+    at.run()
+
+    assert not at.exception
+    assert not at.error
+    user_message, answer, _ = at.session_state.chat_history[-1]
+    assert user_message == "Tell me about admission process"
+    assert answer.strip() == stub_gemini
+    assert len(at.session_state.memory.history()) == 2
+    operations = {row["operation"]: row for row in timings.summary()}
+    assert operations["get_ai_response"]["errors"] == 0
+    assert operations["gemini.first_token"]["count"] >= 1
+
+
+def test_answer_cache_is_scoped_to_the_conversation(stub_gemini, monkeypatch):
+    monkeypatch.setattr(st, "image", lambda *args, **kwargs: None)
+    from cache import answer_cache
+    answer_cache.clear()
+
+    def ask(at, question):
+        at.text_input(key="input").input(question)
+        next(button for button in at.button if button.label == "Send 📤").click()
+        at.run()
+        assert not at.exception
+
+    def new_session():
+        at = AppTest.from_file(f"{ROOT}/app.py", default_timeout=30)
+        at.secrets["GOOGLE_API_KEY"] = "test-key"
+        at.run()
+        return at
+
+    first = new_session()
+    ask(first, "Tell me about admission process")
+    ask(first, "What documents are needed?")
+
+    hits = answer_cache.stats()["hits"]
+    second = new_session()
+    ask(second, "Tell me about admission process")
+    assert answer_cache.stats()["hits"] == hits + 1  # same opening question, empty memory
+    ask(second, "Tell me about admission process")
+    # A follow-up in this conversation is not answered from the other one's entry
+    assert answer_cache.stats()["hits"] == hits + 1
+
+
+def test_streaming_can_be_disabled_from_the_environment(stub_gemini, monkeypatch):
+    monkeypatch.setattr(st, "image", lambda *args, **kwargs: None)
+    monkeypatch.setenv("STREAM_RESPONSES", "false")
+    from cache import answer_cache
+    answer_cache.clear()
+
+    at = AppTest.from_file(f"{ROOT}/app.py", default_timeout=30)
+    at.secrets["GOOGLE_API_KEY"] = "test-key"
+    at.run()
+    at.text_input(key="input").input("Tell me about admission process")
+    next(button for button in at.button if button.label == "Send 📤").click()
+    at.run()
+
+    assert not at.exception
+    # The stub's streamed chunks end in a space; the single response does not
+    assert at.session_state.chat_history[-1][1] == stub_gemini
+
+
+def test_memory_limits_come_from_the_environment(stub_gemini, monkeypatch):
+    monkeypatch.setattr(st, "image", lambda *args, **kwargs: None)
+    monkeypatch.setenv("MEMORY_MAX_TURNS", "1")
+
+    at = AppTest.from_file(f"{ROOT}/app.py", default_timeout=30)
+    at.secrets["GOOGLE_API_KEY"] = "test-key"
+    at.run()
+    assert at.session_state.memory.max_turns == 1
@@ -0,0 +1,22 @@
+import csv
+import os
+from datetime import datetime, timedelta
+import mongomock
+from export import export_chat_history
+
+
+def test_export_stops_at_limit():
+    collection = mongomock.MongoClient()["university_chatbot"]["chat_history"]
+    start = datetime(2025, 3, 1)
+    collection.insert_many([
+        {"timestamp": start + timedelta(minutes=i), "user_id": f"u{i}", "user_message": "hi", "bot_response": "hello"}
+        for i in range(12)
+    ])
+    path, rows = export_chat_history(collection, {}, chunk_size=5, limit=7)
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            exported = list(csv.DictReader(f))
+    finally:
+        os.remove(path)
+    assert rows == 7
+    assert [row["user_id"] for row in exported] == [f"u{i}" for i in range(7)]
@@ -0,0 +1,13 @@
+import mongomock
+from indexes import CHAT_DB, diff_indexes, ensure_indexes
+
+
+def test_diff_reports_changed_ttl():
+    client = mongomock.MongoClient()
+    ensure_indexes(client)
+    assert diff_indexes(client) == []
+
+    revoked = client[CHAT_DB]["revoked_sessions"]
+    revoked.drop_index("expires_at_ttl")
+    revoked.create_index("expires_at", name="expires_at_ttl", expireAfterSeconds=3600)
+    assert diff_indexes(client) == [("changed", CHAT_DB, "revoked_sessions", "expires_at_ttl")]
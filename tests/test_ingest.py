@@ -0,0 +1,74 @@
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+import mongomock
+import pytest
+from ingest import make_handler
+
+API_KEY = "kiosk-key"
+ISSUE = {
+    "name": "Priya", "reg_no": "RA2211003010001", "type": "General",
+    "general_category": "Transport Management", "details": "Bus is late", "idempotency_key": "kiosk-1-0001",
+}
+
+
+@pytest.fixture
+def api():
+    collection = mongomock.MongoClient()["hostel_maintenance"]["issues"]
+    collection.create_index("idempotency_key", unique=True, sparse=True)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(collection, API_KEY))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def post(body, headers=None):
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_port)
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        connection.request("POST", "/issues", body=payload, headers={"X-API-Key": API_KEY, **(headers or {})})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+
+    yield post, collection
+    server.shutdown()
+
+
+def test_created_then_duplicate(api):
+    post, collection = api
+    status, body = post({"issues": [ISSUE]})
+    assert status == 200
+    assert body["created"] == 1
+    status, body = post({"issues": [ISSUE]})
+    assert body["duplicate"] == 1
+    assert body["results"][0]["status"] == "duplicate"
+    assert collection.count_documents({}) == 1
+
+
+def test_invalid_items_are_reported_per_item(api):
+    post, collection = api
+    status, body = post([{"type": "Hostel", "name": "A"}, {**ISSUE, "idempotency_key": "kiosk-1-0002"}])
+    assert status == 200
+    assert [result["status"] for result in body["results"]] == ["invalid", "created"]
+    assert "missing required fields" in body["results"][0]["error"]
+    assert collection.count_documents({}) == 1
+
+
+def test_unauthorized(api):
+    post, collection = api
+    status, _ = post({"issues": [ISSUE]}, headers={"X-API-Key": "wrong"})
+    assert status == 401
+    assert collection.count_documents({}) == 0
+
+
+def test_handler_without_key_rejects_everything():
+    collection = mongomock.MongoClient()["hostel_maintenance"]["issues"]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(collection, None))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    connection.request("POST", "/issues", body=json.dumps([ISSUE]), headers={"X-API-Key": ""})
+    assert connection.getresponse().status == 401
+    server.shutdown()
+
+
+def test_bad_content_length(api):
+    post, _ = api
+    status, _ = post(None, headers={"Content-Length": "abc"})
+    assert status == 400
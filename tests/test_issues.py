@@ -0,0 +1,19 @@
+import mongomock
+from bson import ObjectId
+from issues import migrate
+
+COMPLAINT = {"name": "Priya", "reg_no": "RA2211003010001", "type": "Hostel", "category": "Plumbing",
+             "details": "Tap is leaking", "hostel": "Narmada", "floor": "II", "room_no": "214"}
+
+
+def test_migrate_merges_copies_by_id_not_by_text():
+    db = mongomock.MongoClient()["hostel_maintenance"]
+    db["issues"].create_index("legacy_id", unique=True, sparse=True)
+    first, second = ObjectId(), ObjectId()
+    # The old app stored each issue in admin_issues and its type collection under one _id
+    db["admin_issues"].insert_many([{"_id": first, **COMPLAINT}, {"_id": second, **COMPLAINT}])
+    db["hostel_issues"].insert_many([{"_id": first, **COMPLAINT}, {"_id": second, **COMPLAINT}])
+
+    assert migrate(db) == (4, 2)
+    assert migrate(db) == (4, 2)
+    assert sorted(doc["legacy_id"] for doc in db["issues"].find()) == sorted([first, second])
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+import mongomock
+from metrics import MetricsService
+from rollups import ActivitySketches, DailyRollups
+
+
+def make_service(db):
+    return MetricsService(db["users"], db["chat_history"], DailyRollups(db), ActivitySketches(db))
+
+
+def test_user_stats_flags_missing_backfill():
+    db = mongomock.MongoClient()["university_chatbot"]
+    db["users"].insert_one({"user_id": "a", "created_at": datetime.now(), "access_count": 3})
+    stats = make_service(db).user_stats()
+    assert stats["total_users"] == 0
+    assert stats["needs_backfill"]
+
+    DailyRollups(db).record_new_users([datetime.now()])
+    assert not make_service(db).user_stats()["needs_backfill"]
+
+
+def test_user_stats_week_and_month_come_from_one_sketch_read():
+    db = mongomock.MongoClient()["university_chatbot"]
+    db["users"].insert_many([{"user_id": "a", "access_count": 3}, {"user_id": "b", "access_count": 1}])
+    sketches = ActivitySketches(db)
+    now = datetime.utcnow()
+    sketches.record_chats([
+        {"user_id": "a", "timestamp": now},
+        {"user_id": "b", "timestamp": now - timedelta(days=10)},
+    ])
+    reads = []
+    load = sketches.load
+    sketches.load = lambda *args: reads.append(args) or load(*args)
+
+    stats = MetricsService(db["users"], db["chat_history"], DailyRollups(db), sketches).user_stats()
+    assert len(reads) == 1
+    assert (stats["active_today"], stats["active_this_week"], stats["active_this_month"]) == (1, 1, 2)
+    assert stats["returning_users"] == 1
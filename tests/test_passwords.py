@@ -0,0 +1,34 @@
+import threading
+import bcrypt
+import pytest
+from passwords import PasswordHasher, LoginServiceBusy, LoginTimedOut
+
+
+def test_verify_times_out_and_drops_the_queued_check():
+    hasher = PasswordHasher(rounds=4, max_workers=1, max_pending=2, timeout=0.05)
+    release = threading.Event()
+    hasher._run(release.wait)  # occupies the only worker
+    with pytest.raises(LoginTimedOut):
+        hasher.verify("secret", bcrypt.hashpw(b"secret", bcrypt.gensalt(4)))
+    # The cancelled check gave its slot back: one more job fits, the next is shed
+    hasher._run(release.wait)
+    with pytest.raises(LoginServiceBusy):
+        hasher._run(release.wait)
+    release.set()
+    assert hasher.stats()["timed_out"] == 1
+
+
+def test_timed_out_login_counts_toward_throttle(monkeypatch):
+    import database
+    monkeypatch.setattr(database, "_login_client_key", lambda: "203.0.113.7")
+
+    def slow(password, hashed):
+        raise LoginTimedOut("Login took too long; please try again")
+
+    monkeypatch.setattr(database.password_hasher, "verify", slow)
+    for _ in range(database.account_throttle.max_failures):
+        with pytest.raises(LoginTimedOut):
+            database.verify_admin("slow-admin", "guess")
+    assert database.account_throttle.retry_after("slow-admin") > 0
+    database.account_throttle.reset("slow-admin")
+    database.client_throttle.reset("203.0.113.7")
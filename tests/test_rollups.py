@@ -0,0 +1,30 @@
+from datetime import date, datetime
+import mongomock
+from rollups import ActivitySketches, DailyRollups
+
+
+def test_sketches_count_chatters_per_ist_day():
+    sketches = ActivitySketches(mongomock.MongoClient()["university_chatbot"])
+    sketches.record_chats([
+        {"user_id": "a", "timestamp": datetime(2025, 3, 1, 10, 0)},
+        # 19:00 UTC is already the next day in IST
+        {"user_id": "b", "timestamp": datetime(2025, 3, 1, 19, 0)},
+        {"user_id": "a", "timestamp": datetime(2025, 3, 2, 4, 0)},
+        {"user_id": None, "timestamp": datetime(2025, 3, 2, 5, 0)},
+    ])
+    assert [day["count"] for day in sketches.daily(date(2025, 3, 1), date(2025, 3, 2))] == [1, 2]
+    assert sketches.unique(date(2025, 3, 1), date(2025, 3, 2)) == 2
+
+
+def test_new_users_are_counted_on_their_ist_day(monkeypatch):
+    import time
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    try:
+        rollups = DailyRollups(mongomock.MongoClient()["university_chatbot"])
+        # 20:00 server time on a UTC host is 01:30 the next morning in IST
+        rollups.record_new_users([datetime(2025, 3, 1, 20, 0)])
+        assert [(day["_id"], day["new_users"]) for day in rollups.daily.find()] == [("2025-03-02", 1)]
+    finally:
+        monkeypatch.undo()
+        time.tzset()
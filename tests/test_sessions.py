@@ -0,0 +1,31 @@
+import time
+import mongomock
+from sessions import AdminSessions
+
+
+def make_sessions(db, **kwargs):
+    return AdminSessions(db["revoked_sessions"], db["admins"], secret="test", **kwargs)
+
+
+def test_refresh_on_unsynced_process_does_not_outlive_forced_sign_out():
+    db = mongomock.MongoClient()["chatbot"]
+    app_process = make_sessions(db, refresh_seconds=0.05, sync_seconds=30)
+    cli = make_sessions(db)
+    token = app_process.issue("admin")
+    assert app_process.verify(token) == token  # app_process has now synced
+
+    cli.revoke_user("admin")
+    time.sleep(0.1)
+    assert app_process.verify(token) is None
+    assert app_process.verify(app_process.issue("admin"))
+
+
+def test_revoked_sessions_are_forgotten_after_their_tokens_expire():
+    db = mongomock.MongoClient()["chatbot"]
+    sessions = make_sessions(db, ttl_seconds=1, sync_seconds=0)
+    token = sessions.issue("admin")
+    sessions.revoke(token)
+    assert sessions.verify(token) is None
+    time.sleep(1.1)
+    assert sessions.verify(sessions.issue("admin"))  # checking a live token re-syncs the list
+    assert sessions.stats()["revoked_sessions"] == 0
@@ -0,0 +1,50 @@
+import mongomock
+from bson import json_util
+from pymongo.errors import BulkWriteError
+from write_behind import WriteBehindQueue
+
+
+class FlakyCollection:
+    """Inserts every document except those at `failing` indexes, like an unordered bulk write"""
+
+    def __init__(self, failing):
+        self.failing = failing
+        self.documents = []
+
+    def insert_many(self, documents, ordered=True):
+        errors = [{"index": index, "code": 91, "errmsg": "shutdown in progress"} for index in self.failing]
+        self.documents += [doc for index, doc in enumerate(documents) if index not in self.failing]
+        raise BulkWriteError({"writeErrors": errors, "nInserted": len(documents) - len(errors)})
+
+
+def make_writer(collection, spill_path, flushed):
+    return WriteBehindQueue(collection, batch_size=10, flush_interval=0.05, spill_path=str(spill_path),
+                            on_flush=flushed.extend)
+
+
+def test_partial_failure_spills_only_failed_documents(tmp_path):
+    flushed = []
+    writer = make_writer(FlakyCollection(failing={1}), tmp_path / "spill.jsonl", flushed)
+    writer.close()
+
+    writer._flush([{"_id": 1, "n": "a"}, {"_id": 2, "n": "b"}, {"_id": 3, "n": "c"}])
+    assert [doc["n"] for doc in flushed] == ["a", "c"]
+    assert writer.stats()["written"] == 2
+    spilled = [json_util.loads(line) for line in open(tmp_path / "spill.jsonl")]
+    assert spilled == [{"_id": 2, "n": "b"}]
+
+
+def test_replaying_an_already_written_document_is_not_counted_twice(tmp_path):
+    collection = mongomock.MongoClient()["university_chatbot"]["chat_history"]
+    document = {"user_message": "hi"}
+    collection.insert_one(document)
+    spill_path = tmp_path / "spill.jsonl"
+    spill_path.write_text(json_util.dumps(document) + "\n")
+
+    flushed = []
+    writer = make_writer(collection, spill_path, flushed)
+    assert writer.replay_spill() == 1
+    writer.close()
+    assert collection.count_documents({}) == 1
+    assert flushed == []
+    assert not spill_path.exists()
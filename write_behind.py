@@ -0,0 +1,165 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from bson import json_util
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY = 11000
+
+
+class WriteBehindQueue:
+    """Background writer that batches documents into insert_many calls.
+
+    Documents are flushed when `batch_size` are waiting or `flush_interval`
+    seconds have passed. On shutdown the queue is drained; anything that still
+    cannot be written is spilled to a JSON-lines file and replayed on next start.
+    Spilled documents keep their _id, so a replay of one that did reach the
+    database is rejected as a duplicate instead of written (and counted) twice.
+    """
+
+    def __init__(self, collection, batch_size=50, flush_interval=1.0, max_queue=10000, spill_path=None, name="write-behind", on_flush=None):
+        self.collection = collection
+        self.on_flush = on_flush  # called with each successfully written batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.overflow_writes = 0
+        self.spilled = 0
+        self.batches = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, document):
+        """Queue a document; if the queue is full, write it directly instead of dropping it"""
+        try:
+            self._queue.put_nowait(document)
+            with self._lock:
+                self.enqueued += 1
+        except queue.Full:
+            self.collection.insert_one(document)
+            with self._lock:
+                self.overflow_writes += 1
+            self._notify([document])
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+
+    def _collect(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch):
+        started = time.perf_counter()
+        written, failed = batch, []
+        try:
+            self.collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Unordered: everything without a write error was inserted. A duplicate key
+            # can never succeed on retry; on _id it means an earlier attempt already
+            # wrote the document, so it is neither spilled nor passed to the hook again.
+            errors = {error["index"]: error.get("code") for error in e.details.get("writeErrors", [])}
+            written = [document for index, document in enumerate(batch) if index not in errors]
+            failed = [batch[index] for index, code in errors.items() if code != DUPLICATE_KEY]
+            print(f"Error flushing {len(errors)} of {len(batch)} queued writes: {str(e)}")
+        except Exception as e:
+            print(f"Error flushing {len(batch)} queued writes: {str(e)}")
+            written, failed = [], batch
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.batches += 1
+            self.last_flush_ms = round(elapsed, 2)
+            self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+            self._total_flush_ms += elapsed
+            self.written += len(written)
+            self.failed += len(failed)
+        if written:
+            self._notify(written)
+        self._spill(failed)
+
+    def _notify(self, documents):
+        if self.on_flush:
+            try:
+                self.on_flush(documents)
+            except Exception as e:
+                print(f"Error in flush hook: {str(e)}")
+
+    def _spill(self, documents):
+        if not self.spill_path or not documents:
+            return
+        with self._lock:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for document in documents:
+                    f.write(json_util.dumps(document) + "\n")
+            self.spilled += len(documents)
+
+    def replay_spill(self):
+        """Queue documents left in the spill file by an earlier process"""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return 0
+        replay_path = f"{self.spill_path}.replaying"
+        os.replace(self.spill_path, replay_path)
+        count = 0
+        with open(replay_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    self.put(json_util.loads(line))
+                    count += 1
+        os.remove(replay_path)
+        return count
+
+    def close(self, timeout=10):
+        """Stop the writer, flush what is queued and spill anything left over"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=self.flush_interval + 1)
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        deadline = time.monotonic() + timeout
+        while remaining and time.monotonic() < deadline:
+            batch, remaining = remaining[:self.batch_size], remaining[self.batch_size:]
+            self._flush(batch)
+        self._spill(remaining)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "failed": self.failed,
+                "overflow_writes": self.overflow_writes,
+                "spilled": self.spilled,
+                "batches": self.batches,
+                "last_flush_ms": self.last_flush_ms,
+                "avg_flush_ms": round(self._total_flush_ms / self.batches, 2) if self.batches else 0,
+                "max_flush_ms": self.max_flush_ms,
+            }